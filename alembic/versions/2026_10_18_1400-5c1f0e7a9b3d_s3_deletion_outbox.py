@@ -0,0 +1,58 @@
+"""s3 deletion outbox
+
+Revision ID: 5c1f0e7a9b3d
+Revises: 2093880a4f4b
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1f0e7a9b3d"
+down_revision: Union[str, None] = "2093880a4f4b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "s3_deletion_outbox",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column(
+            "attempts", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "next_attempt_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_s3_deletion_outbox_next_attempt_at"),
+        "s3_deletion_outbox",
+        ["next_attempt_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_s3_deletion_outbox_next_attempt_at"),
+        table_name="s3_deletion_outbox",
+    )
+    op.drop_table("s3_deletion_outbox")
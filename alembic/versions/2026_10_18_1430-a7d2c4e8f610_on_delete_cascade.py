@@ -0,0 +1,56 @@
+"""on delete cascade
+
+Revision ID: a7d2c4e8f610
+Revises: 5c1f0e7a9b3d
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d2c4e8f610"
+down_revision: Union[str, None] = "5c1f0e7a9b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, referred table)
+FOREIGN_KEYS = (
+    ("question", "test_id", "test"),
+    ("answer", "question_id", "question"),
+    ("test_result", "test_id", "test"),
+)
+
+
+def replace_foreign_keys(**kwargs) -> None:
+    # NOT VALID skips the scan of existing rows, so the lock on each table is held only
+    # for the catalog change; the rows are checked below without blocking writes
+    for table, column, referred_table in FOREIGN_KEYS:
+        name = f"{table}_{column}_fkey"
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(
+            name,
+            table,
+            referred_table,
+            [column],
+            ["id"],
+            postgresql_not_valid=True,
+            **kwargs,
+        )
+    # VALIDATE CONSTRAINT takes SHARE UPDATE EXCLUSIVE: reads and writes continue meanwhile.
+    # It runs after the new constraints are committed, one table at a time
+    with op.get_context().autocommit_block():
+        for table, column, _ in FOREIGN_KEYS:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}_fkey")
+
+
+def upgrade() -> None:
+    replace_foreign_keys(ondelete="CASCADE")
+
+
+def downgrade() -> None:
+    replace_foreign_keys()
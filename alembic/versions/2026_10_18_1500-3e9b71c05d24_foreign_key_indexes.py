@@ -0,0 +1,52 @@
+"""foreign key indexes
+
+Revision ID: 3e9b71c05d24
+Revises: a7d2c4e8f610
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3e9b71c05d24"
+down_revision: Union[str, None] = "a7d2c4e8f610"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = (
+    ("ix_question_test_id", "question", ["test_id"]),
+    ("ix_answer_question_id", "answer", ["question_id"]),
+    ("ix_test_result_test_id_id", "test_result", ["test_id", "id"]),
+    ("ix_test_result_test_id_created_at", "test_result", ["test_id", "created_at"]),
+)
+
+
+def upgrade() -> None:
+    # CONCURRENTLY does not lock the tables for writes, but can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,125 @@
+"""
+Reproducible benchmark suite: seed, run the suites, write one JSON report.
+
+    cd src && python -m benchmarks --output report.json
+    cd src && python -m benchmarks --quick --suites repositories,api_load
+    python -m benchmarks.compare base.json report.json
+
+Needs the Postgres from DATABASE_URL (migrated, `alembic upgrade head`).
+S3 is the one from the environment; when AWS_ENDPOINT_URL is not set, a
+local moto stand-in is started and the bucket created, so no AWS account
+is needed. The data is seeded through the models (benchmarks.seed) with
+fixed sizes, from scratch unless `--keep-data` is given, then every
+suite runs in its own interpreter with fixed arguments and its JSON line
+goes into the report next to the commit, Python version and CPU count,
+so reports of two commits can be compared with benchmarks.compare.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+
+SEED = {
+    "full": ["--tests", "500", "--questions", "20", "--answers", "4", "--results", "100"],
+    "quick": ["--tests", "100", "--questions", "10", "--answers", "4", "--results", "20"],
+}
+
+SUITES = {
+    "import_time": {"full": [], "quick": ["--repeat", "3"]},
+    "serialization": {"full": [], "quick": ["--number", "5"]},
+    "repositories": {"full": ["--number", "200"], "quick": ["--number", "50"]},
+    "api_load": {"full": ["--duration", "20"], "quick": ["--duration", "5"]},
+}
+
+
+def git_revision() -> dict:
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def run_suite(module: str, args: list[str]) -> dict:
+    """Runs `python -m benchmarks.<module>` and returns its report line"""
+    process = subprocess.run(
+        [sys.executable, "-m", f"benchmarks.{module}", *args], stdout=subprocess.PIPE, text=True
+    )
+    lines = [line for line in process.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        return {"error": f"exit code {process.returncode}, no report"}
+    result = json.loads(lines[-1])
+    result.pop("benchmark", None)
+    if process.returncode:
+        result["exit_code"] = process.returncode
+    return result
+
+
+def ensure_s3(port: int) -> str:
+    """The S3 endpoint to use: the configured one or a local moto stand-in with the bucket created"""
+    if os.environ.get("AWS_ENDPOINT_URL"):
+        return os.environ["AWS_ENDPOINT_URL"]
+
+    import boto3
+    from benchmarks.utils import start_s3_stand_in
+
+    start_s3_stand_in(port)
+    boto3.client("s3", endpoint_url=os.environ["AWS_ENDPOINT_URL"]).create_bucket(Bucket=os.environ["BUCKET_NAME"])
+    return "moto"
+
+
+def main(args) -> int:
+    profile = "quick" if args.quick else "full"
+    suites = args.suites.split(",")
+    unknown = [name for name in suites if name not in SUITES]
+    if unknown:
+        raise SystemExit(f"Unknown suites: {', '.join(unknown)} (available: {', '.join(SUITES)})")
+
+    s3 = ensure_s3(args.s3_port)
+    benchmarks = {"seed": run_suite("seed", SEED[profile] + ([] if args.keep_data else ["--reset"]))}
+    for name in suites:
+        print(f"Running {name}...", file=sys.stderr, flush=True)
+        benchmarks[name] = run_suite(name, SUITES[name][profile])
+
+    report = {
+        "meta": {
+            **git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "profile": profile,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "s3": s3,
+        },
+        "benchmarks": benchmarks,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    failed = [name for name, result in benchmarks.items() if "error" in result or result.get("exit_code")]
+    if failed:
+        print(f"Failed suites: {', '.join(failed)}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--output", "-o", help="report file (default: stdout)")
+    parser.add_argument("--suites", default=",".join(SUITES), help="comma-separated suites to run")
+    parser.add_argument("--quick", action="store_true", help="smaller data set and shorter runs")
+    parser.add_argument("--keep-data", action="store_true",
+                        help="reuse the seeded tests when their sizes match instead of reseeding")
+    parser.add_argument("--s3-port", type=int, default=5056, help="port of the moto stand-in")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,168 @@
+"""
+Weighted API load over seeded data: /test/ reads and /question/ writes.
+
+`--concurrency` keep-alive connections pick scenarios from a fixed-seed
+weighted mix for `--duration` seconds; every request is recorded under
+its endpoint name, so the report has per-endpoint latency, throughput
+and errors. Scenarios:
+
+    test            GET /test/?test_id=
+    test_expanded   GET /test/?test_id=&expand=questions.answers
+    test_page       GET /test/page?after_id=
+    summary         GET /test/results/summary?test_id=
+    question_write  POST /question/, POST /question/attachment/upload-url,
+                    PATCH /question/, DELETE /question/
+
+Test ids come from `--test-ids first-last` or, by default, from the tests
+created by benchmarks.seed. Without `--url` the production server is
+started (benchmarks.load_test.start_server) with the current environment.
+
+    cd src && python -m benchmarks.seed && python -m benchmarks.api_load --duration 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+import httpx
+
+from benchmarks.utils import latency_summary, report
+
+
+SCENARIOS = {
+    "test": 40,
+    "test_expanded": 20,
+    "test_page": 15,
+    "summary": 10,
+    "question_write": 15,
+}
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, test_id: int, record) -> None:
+    if name == "test":
+        await record("test", client.get("/test/", params={"test_id": test_id}))
+    elif name == "test_expanded":
+        await record("test_expanded", client.get("/test/", params={"test_id": test_id, "expand": "questions.answers"}))
+    elif name == "test_page":
+        await record("test_page", client.get("/test/page", params={"after_id": test_id, "limit": 20}))
+    elif name == "summary":
+        await record("summary", client.get("/test/results/summary", params={"test_id": test_id}))
+    elif name == "question_write":
+        created = await record("question_create", client.post("/question/", params={"title": "load", "test_id": test_id}))
+        if created is None or created.status_code != 200:
+            return
+        question_id = created.json()["id"]
+        await record("upload_url", client.post(
+            "/question/attachment/upload-url", params={"question_id": question_id, "filename": "image.png"}
+        ))
+        await record("question_update", client.patch(
+            "/question/", params={"question_id_to_update": question_id, "title": "load updated"}
+        ))
+        await record("question_delete", client.delete("/question/", params={"question_id": question_id}))
+
+
+async def run_mix(base_url: str, test_ids: list[int], concurrency: int, duration: float, seed: int = 0) -> dict:
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+
+    async def record(endpoint: str, request) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            response = None
+        latencies.setdefault(endpoint, []).append(time.perf_counter() - start)
+        if response is None or response.status_code >= 400:
+            errors[endpoint] = errors.get(endpoint, 0) + 1
+        return response
+
+    names, weights = list(SCENARIOS), list(SCENARIOS.values())
+    deadline = time.perf_counter() + duration
+
+    async def connection(worker: int) -> None:
+        rng = random.Random(seed + worker)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            await run_scenario(client, name, rng.choice(test_ids), record)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(connection(worker) for worker in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "requests": total,
+        "errors": sum(errors.values()),
+        "rps": round(total / elapsed, 1),
+        "endpoints": {
+            endpoint: {
+                "rps": round(len(values) / elapsed, 1),
+                "errors": errors.get(endpoint, 0),
+                **latency_summary(values),
+            }
+            for endpoint, values in sorted(latencies.items())
+        },
+    }
+
+
+async def load_seeded_ids(prefix: str) -> list[int]:
+    from benchmarks.seed import seeded_test_ids
+    from database import dispose_engine, session_factory
+
+    async with session_factory() as session:
+        ids = await seeded_test_ids(session, prefix)
+    await dispose_engine()
+    return ids
+
+
+def main(args) -> None:
+    from benchmarks.load_test import start_server, wait_ready
+
+    if args.test_ids:
+        first, _, last = args.test_ids.partition("-")
+        test_ids = list(range(int(first), int(last or first) + 1))
+    else:
+        test_ids = asyncio.run(load_seeded_ids(args.prefix))
+    if not test_ids:
+        raise SystemExit("No seeded tests: run `python -m benchmarks.seed` first or pass --test-ids")
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server = start_server(args.workers, args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_ready(base_url)
+        asyncio.run(run_mix(base_url, test_ids, args.concurrency, min(2.0, args.duration), args.seed))  # warm-up
+        result = asyncio.run(run_mix(base_url, test_ids, args.concurrency, args.duration, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report("api_load", {
+        "url": args.url,
+        "workers": None if args.url else args.workers,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "tests": len(test_ids),
+        "cpus": os.cpu_count(),
+        "scenarios": SCENARIOS,
+        **result,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--test-ids", help="id range to use, e.g. 1-1000 (default: the seeded tests)")
+    parser.add_argument("--prefix", default="benchmark", help="title prefix of the seeded tests")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the scenario mix")
+    main(parser.parse_args())
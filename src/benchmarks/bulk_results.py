@@ -0,0 +1,80 @@
+"""
+Single-row TestResultRepository.create vs bulk_create throughput.
+
+Writes `--rows` results into one benchmark test in the Postgres from
+DATABASE_URL with each path and reports sustained rows/second. The
+bulk path is fed NDJSON lines, as the /test/results/bulk endpoint is.
+
+    cd src && python -m benchmarks.bulk_results --rows 20000
+"""
+import argparse
+import asyncio
+import json
+
+
+async def ndjson_rows(count: int, test_id: int):
+    for index in range(count):
+        line = json.dumps({
+            "username": f"user {index}",
+            "user_email": f"user{index}@example.com",
+            "grade": index % 100,
+            "test_id": test_id,
+        })
+        yield index, line.encode()
+
+
+async def main(args) -> None:
+    from database import session_factory
+    from database.models import Test
+    from database.schemas import TestResultCreateSchema
+    from repositories.test_result_repository import TestResultRepository
+    from benchmarks.utils import report, timer
+
+    repo = TestResultRepository()
+    async with session_factory() as session:
+        test = Test(title="bulk results benchmark")
+        session.add(test)
+        await session.commit()
+
+        single_rows = min(args.rows, args.single_rows)
+        with timer() as single:
+            for index in range(single_rows):
+                await repo.create(session, TestResultCreateSchema(
+                    username=f"user {index}",
+                    user_email=f"user{index}@example.com",
+                    grade=index % 100,
+                    test_id=test.id,
+                ))
+
+        with timer() as bulk:
+            result = await repo.bulk_create(
+                session, ndjson_rows(args.rows, test.id), batch_size=args.batch_size
+            )
+        assert len(result.ids) == args.rows and not result.errors
+
+        await session.delete(test)
+        await session.commit()
+
+    report("bulk_results", {
+        "rows": args.rows,
+        "batch_size": args.batch_size,
+        "single": {
+            "rows": single_rows,
+            "seconds": round(single["elapsed"], 3),
+            "rows_per_s": round(single_rows / single["elapsed"]),
+        },
+        "bulk": {
+            "rows": args.rows,
+            "seconds": round(bulk["elapsed"], 3),
+            "rows_per_s": round(args.rows / bulk["elapsed"]),
+        },
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--single-rows", type=int, default=2_000,
+                        help="the single-create path is slow; it is timed on this many rows")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,111 @@
+"""
+Compare two benchmark reports and fail on regressions.
+
+Flattens both reports (written by `python -m benchmarks`, or single
+benchmark JSON lines) to dotted metric names and compares the metrics
+with a known direction: latencies and durations (`*_ms`, `seconds`), SQL
+statement counts (`queries`) and error counts should not grow,
+throughput (`rps`, `rows_per_s`, `speedup`) should not drop. A metric that got worse by more than
+`--threshold` (relative) is a regression and the exit code is 1.
+
+    cd src && python -m benchmarks.compare base.json head.json --threshold 0.15
+"""
+import argparse
+import json
+import sys
+
+
+LOWER_IS_BETTER = ("_ms", "seconds", "queries", "errors")
+HIGHER_IS_BETTER = ("rps", "rows_per_s", "speedup")
+LIST_LABELS = ("name", "export", "call", "workers", "depth")
+SKIPPED = ("seed",)  # час сідування залежить від того, скільки даних уже було
+
+
+def load(path: str) -> dict:
+    with open(path) as file:
+        text = file.read()
+    try:
+        reports = [json.loads(text)]
+    except json.JSONDecodeError:
+        reports = [json.loads(line) for line in text.splitlines() if line.startswith("{")]
+    if not reports:
+        raise SystemExit(f"{path}: no benchmark report")
+    if "meta" in reports[0]:
+        benchmarks = reports[0]["benchmarks"]
+    else:
+        # JSON-рядки окремих бенчмарків
+        benchmarks = {data.pop("benchmark"): data for data in reports}
+    return {name: data for name, data in benchmarks.items() if name not in SKIPPED}
+
+
+def flatten(value, prefix: str = "") -> dict[str, float]:
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = []
+        for index, item in enumerate(value):
+            label = next((item[key] for key in LIST_LABELS if isinstance(item, dict) and key in item), index)
+            items.append((str(label), item))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    else:
+        return {}
+    metrics = {}
+    for key, item in items:
+        metrics.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    return metrics
+
+
+def direction(metric: str) -> int:
+    """+1 — більше краще, -1 — менше краще, 0 — не порівнюється"""
+    name = metric.rsplit(".", 1)[-1]
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(base: dict[str, float], head: dict[str, float], threshold: float) -> list[dict]:
+    rows = []
+    for metric in sorted(base.keys() & head.keys()):
+        sign = direction(metric)
+        if not sign:
+            continue
+        before, after = base[metric], head[metric]
+        if before == after:
+            change = 0.0
+        elif before:
+            change = (after - before) / abs(before)
+        else:
+            change = float("inf")
+        rows.append({
+            "metric": metric,
+            "base": before,
+            "head": after,
+            "change": change,
+            "regression": -sign * change > threshold,
+        })
+    return rows
+
+
+def main(args) -> int:
+    rows = compare(flatten(load(args.base)), flatten(load(args.head)), args.threshold)
+    regressions = [row for row in rows if row["regression"]]
+    shown = regressions if args.regressions_only else rows
+
+    width = max((len(row["metric"]) for row in shown), default=0)
+    for row in shown:
+        marker = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['metric']:<{width}}  {row['base']:>12g}  {row['head']:>12g}  {row['change']:+8.1%}{marker}")
+    print(f"{len(rows)} metrics compared, {len(regressions)} regressions over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", help="report of the baseline commit")
+    parser.add_argument("head", help="report of the commit under test")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative change (0.1 = 10%%)")
+    parser.add_argument("--regressions-only", action="store_true")
+    sys.exit(main(parser.parse_args()))
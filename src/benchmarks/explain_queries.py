@@ -0,0 +1,118 @@
+"""
+EXPLAIN plans of the repository queries on a large seeded dataset.
+
+Seeds tests/questions/answers/results with generate_series (once; an
+already seeded database is reused), runs the repository calls, captures
+every SQL statement they emit and reports its EXPLAIN ANALYZE plan:
+execution time and whether a child table is read with a Seq Scan.
+
+    cd src && python -m benchmarks.explain_queries --tests 20000
+"""
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import event, func, select, text
+
+
+SEED_STATEMENTS = (
+    "INSERT INTO test (title) "
+    "SELECT 'test ' || g FROM generate_series(1, :tests) AS g",
+    "INSERT INTO question (title, test_id) "
+    "SELECT 'question ' || q, t.id FROM test AS t, generate_series(1, :questions) AS q",
+    "INSERT INTO answer (text, points, is_correct, is_required, question_id) "
+    "SELECT 'answer ' || a, 1, a = 1, false, q.id FROM question AS q, generate_series(1, :answers) AS a",
+    "INSERT INTO test_result (username, user_email, grade, test_id, created_at) "
+    "SELECT 'user ' || r, 'user' || (r % 1000) || '@example.com', random() * 100, "
+    "1 + (r % :tests), now() - (r % 365) * interval '1 day' "
+    "FROM generate_series(1, :results) AS r",
+)
+
+
+async def seed_large_dataset(session, tests: int, questions: int, answers: int, results: int) -> None:
+    from database.models import Test
+
+    if await session.scalar(select(func.count()).select_from(Test)):
+        return
+    params = {"tests": tests, "questions": questions, "answers": answers, "results": results}
+    for statement in SEED_STATEMENTS:
+        await session.execute(text(statement), params)
+    await session.commit()
+    for table in ("test", "question", "answer", "test_result"):
+        await session.execute(text(f"ANALYZE {table}"))
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def main(args) -> None:
+    from database import engine, session_factory
+    from repositories.test_repository import TestRepository
+    from repositories.test_result_repository import TestResultRepository
+    from benchmarks.utils import report
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    async with session_factory() as session:
+        await seed_large_dataset(session, args.tests, args.questions, args.answers, args.results)
+
+        test_id = args.tests // 2
+        calls = {
+            "get_tests(expand=questions.answers)": lambda: TestRepository().get_tests(
+                session, skip=0, limit=10, test_id=test_id, expand={"questions.answers"}
+            ),
+            "get_results_page": lambda: TestResultRepository().get_results_page(session, test_id, limit=50),
+            "get_results_page(created_from)": lambda: TestResultRepository().get_results_page(
+                session, test_id, limit=50, created_from=text("now() - interval '30 days'")
+            ),
+            "get_summaries": lambda: TestResultRepository().get_summaries(session, [test_id]),
+        }
+
+        plans = []
+        for name, call in calls.items():
+            captured.clear()
+            event.listen(engine.sync_engine, "before_cursor_execute", capture)
+            try:
+                await call()
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+            for statement, parameters in list(captured):
+                connection = await session.connection()
+                result = await connection.exec_driver_sql(
+                    "EXPLAIN (ANALYZE, FORMAT JSON) " + statement, tuple(parameters)
+                )
+                explain = result.scalar()
+                explain = json.loads(explain) if isinstance(explain, str) else explain
+                nodes = list(plan_nodes(explain[0]["Plan"]))
+                plans.append({
+                    "call": name,
+                    "statement": " ".join(statement.split())[:120],
+                    "execution_ms": explain[0]["Execution Time"],
+                    "seq_scans": sorted({n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan"}),
+                    "indexes": sorted({n["Index Name"] for n in nodes if "Index Name" in n}),
+                })
+
+    report("explain_queries", {
+        "tests": args.tests,
+        "questions_per_test": args.questions,
+        "answers_per_question": args.answers,
+        "results": args.results,
+        "plans": plans,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tests", type=int, default=20_000)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--answers", type=int, default=4)
+    parser.add_argument("--results", type=int, default=1_000_000)
+    asyncio.run(main(parser.parse_args()))
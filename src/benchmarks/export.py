@@ -0,0 +1,87 @@
+"""
+Streaming export throughput and memory.
+
+Seeds `--results` test results (once; existing rows are reused) into the
+Postgres from DATABASE_URL, drains export_results / export_tests in each
+format and reports rows/second plus the growth of the process's peak RSS
+while exporting, which should stay flat as the table grows.
+
+    cd src && python -m benchmarks.export --results 1000000
+"""
+import argparse
+import asyncio
+import resource
+
+from sqlalchemy import func, select, text
+
+
+async def seed_results(session, count: int) -> None:
+    from database.models import Test, TestResult
+
+    existing = await session.scalar(select(func.count()).select_from(TestResult))
+    if existing >= count:
+        return
+    test_id = await session.scalar(select(Test.id).limit(1))
+    if test_id is None:
+        session.add(test := Test(title="export benchmark"))
+        await session.flush()
+        test_id = test.id
+    await session.execute(
+        text(
+            "INSERT INTO test_result (username, user_email, grade, test_id) "
+            "SELECT 'user ' || g, 'user' || g || '@example.com', g % 100, :test_id "
+            "FROM generate_series(1, :n) AS g"
+        ),
+        {"n": count - existing, "test_id": test_id},
+    )
+    await session.commit()
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def drain(chunks) -> tuple[int, int]:
+    """Returns (lines, bytes) of an export stream"""
+    lines = size = 0
+    async for chunk in chunks:
+        lines += chunk.count(b"\n")
+        size += len(chunk)
+    return lines, size
+
+
+async def main(args) -> None:
+    from database import session_factory
+    from export import export_results, export_tests
+    from benchmarks.utils import report, timer
+
+    async with session_factory() as session:
+        await seed_results(session, args.results)
+
+    runs = []
+    for name, make_chunks in (
+        ("results.ndjson", lambda: export_results("ndjson")),
+        ("results.csv", lambda: export_results("csv")),
+        ("tests.ndjson", lambda: export_tests("ndjson")),
+        ("tests.ndjson?expand=questions.answers", lambda: export_tests("ndjson", {"questions.answers"})),
+    ):
+        rss_before = peak_rss_mb()
+        with timer() as t:
+            lines, size = await drain(make_chunks())
+        rows = lines - 1 if name.endswith(".csv") else lines
+        runs.append({
+            "export": name,
+            "rows": rows,
+            "mb": round(size / 2**20, 2),
+            "seconds": round(t["elapsed"], 3),
+            "rows_per_s": round(rows / t["elapsed"]) if t["elapsed"] else None,
+            "peak_rss_growth_mb": round(peak_rss_mb() - rss_before, 1),
+        })
+
+    report("export", {"results": args.results, "runs": runs})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--results", type=int, default=1_000_000)
+    asyncio.run(main(parser.parse_args()))
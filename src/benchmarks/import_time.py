@@ -0,0 +1,67 @@
+"""
+Import-time budget for the application module.
+
+Imports `main` in fresh interpreters and fails (exit code 1) when the
+median import time exceeds `--budget-ms`, or when the import has side
+effects that belong in the lifespan: loading boto3/botocore or a DB
+driver, reading settings sections, or creating the engine.
+
+    cd src && python -m benchmarks.import_time --budget-ms 1500
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from benchmarks.utils import report
+
+
+FORBIDDEN_MODULES = ("boto3", "botocore", "asyncpg", "redis")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+from config import settings
+from database import get_engine
+print(json.dumps({
+    "ms": elapsed * 1000,
+    "modules": [name for name in %r if name in sys.modules],
+    "settings_loaded": sorted(vars(settings)),
+    "engine_created": get_engine.cache_info().currsize > 0,
+}))
+""" % (FORBIDDEN_MODULES,)
+
+
+def probe() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main(args) -> int:
+    runs = [probe() for _ in range(args.repeat)]
+    median_ms = statistics.median(run["ms"] for run in runs)
+    side_effects = {
+        "modules": sorted({name for run in runs for name in run["modules"]}),
+        "settings_loaded": sorted({name for run in runs for name in run["settings_loaded"]}),
+        "engine_created": any(run["engine_created"] for run in runs),
+    }
+    passed = median_ms <= args.budget_ms and not any(side_effects.values())
+    report("import_time", {
+        "median_ms": round(median_ms, 1),
+        "budget_ms": args.budget_ms,
+        "side_effects": side_effects,
+        "passed": passed,
+    })
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--repeat", type=int, default=5)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,125 @@
+"""
+Throughput of the production server profile at different worker counts.
+
+For every value of `--workers` starts `python server.py` (WEB_WORKERS=n),
+waits for /readyz, drives `--paths` with `--concurrency` keep-alive
+connections spread over `--client-processes` load-generator processes
+for `--duration` seconds, and reports requests/second and latency. The
+generator runs in its own processes so it is not competing with itself
+for one core; on a single machine it still shares the CPUs with the
+server, so leave headroom (client processes + workers <= cores).
+
+    cd src && python -m benchmarks.load_test --workers 1,2,4 --paths "/test/?test_id=1"
+    cd src && python -m benchmarks.load_test --url http://staging:8080 --paths /test/page
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.utils import latency_summary, report
+
+
+async def drive(base_url: str, paths: list[str], concurrency: int, duration: float) -> dict:
+    """One load-generator process: `concurrency` connections looping over paths"""
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def connection(worker: int) -> None:
+        nonlocal errors
+        index = worker
+        while time.perf_counter() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await asyncio.gather(*(connection(worker) for worker in range(concurrency)))
+    return {"latencies": latencies, "errors": errors}
+
+
+def _drive_process(args: tuple) -> dict:
+    return asyncio.run(drive(*args))
+
+
+def run_load(base_url: str, paths: list[str], concurrency: int, duration: float, processes: int) -> dict:
+    per_process = max(1, concurrency // processes)
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        results = pool.map(_drive_process, [(base_url, paths, per_process, duration)] * processes)
+    latencies = [value for result in results for value in result["latencies"]]
+    return {
+        "requests": len(latencies),
+        "errors": sum(result["errors"] for result in results),
+        "rps": round(len(latencies) / duration, 1),
+        "latency": latency_summary(latencies) if latencies else None,
+    }
+
+
+def wait_ready(base_url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/readyz", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{base_url} did not become ready in {timeout}s")
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "WEB_WORKERS": str(workers), "WEB_PORT": str(port), "WEB_HOST": "127.0.0.1"}
+    return subprocess.Popen([sys.executable, "server.py"], env=env)
+
+
+def main(args) -> None:
+    paths = args.paths.split(",")
+    runs = []
+    if args.url:
+        wait_ready(args.url)
+        runs.append({"url": args.url, **run_load(args.url, paths, args.concurrency, args.duration, args.client_processes)})
+    else:
+        for workers in (int(value) for value in args.workers.split(",")):
+            server = start_server(workers, args.port)
+            base_url = f"http://127.0.0.1:{args.port}"
+            try:
+                wait_ready(base_url)
+                run_load(base_url, paths, args.concurrency, min(2.0, args.duration), args.client_processes)  # warm-up
+                runs.append({"workers": workers, **run_load(base_url, paths, args.concurrency, args.duration, args.client_processes)})
+            finally:
+                server.terminate()
+                server.wait()
+
+    report("load_test", {
+        "paths": paths,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "cpus": os.cpu_count(),
+        "runs": runs,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts to compare")
+    parser.add_argument("--paths", default="/healthz", help="comma-separated request paths, used round-robin")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8090)
+    main(parser.parse_args())
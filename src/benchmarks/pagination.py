@@ -0,0 +1,71 @@
+"""
+Offset vs keyset pagination of TestRepository at growing page depth.
+
+Seeds `--tests` rows into the Postgres from DATABASE_URL (once; existing
+rows are reused) and times one page at each depth with both modes.
+
+    cd src && python -m benchmarks.pagination --tests 1000000
+"""
+import argparse
+import asyncio
+import statistics
+
+from sqlalchemy import func, select, text
+
+
+async def seed_tests(session, count: int) -> None:
+    from database.models import Test
+
+    existing = await session.scalar(select(func.count()).select_from(Test))
+    if existing < count:
+        await session.execute(
+            text(
+                "INSERT INTO test (title) "
+                "SELECT 'benchmark test ' || g FROM generate_series(1, :n) AS g"
+            ),
+            {"n": count - existing},
+        )
+        await session.commit()
+
+
+async def main(args) -> None:
+    from database import session_factory
+    from database.models import Test
+    from repositories.test_repository import TestRepository
+    from benchmarks.utils import report, timer
+
+    repo = TestRepository()
+    async with session_factory() as session:
+        await seed_tests(session, args.tests)
+
+        depths = [d for d in (0, 1_000, 10_000, 100_000, 500_000, 999_000) if d < args.tests]
+        results = []
+        for depth in depths:
+            after_id = await session.scalar(
+                select(Test.id).order_by(Test.id).offset(depth - 1).limit(1)
+            ) if depth else None
+
+            offset_times, keyset_times = [], []
+            for _ in range(args.repeat):
+                with timer() as t:
+                    await repo.get_tests(session, skip=depth, limit=args.limit)
+                offset_times.append(t["elapsed"])
+                with timer() as t:
+                    await repo.get_tests_page(session, after_id=after_id, limit=args.limit)
+                keyset_times.append(t["elapsed"])
+
+            results.append({
+                "depth": depth,
+                "offset_ms": round(statistics.median(offset_times) * 1000, 3),
+                "keyset_ms": round(statistics.median(keyset_times) * 1000, 3),
+            })
+
+    report("pagination", {"tests": args.tests, "limit": args.limit, "pages": results})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tests", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
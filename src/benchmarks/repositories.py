@@ -0,0 +1,138 @@
+"""
+Microbenchmarks of the repository read paths over the seeded tests.
+
+Each case runs `--number` times, cycling through the tests created by
+benchmarks.seed, and reports p50/p90/p99 per call and the SQL statements
+one call executes (instrumentation.track_queries), so benchmarks.compare
+catches extra round-trips as well as slower ones. Every case also has a
+fixed SQL budget (QUERY_BUDGETS) enforced by track_queries(budget=...):
+a call over it is reported under `budget_exceeded` and the exit code is 1.
+
+    get_tests                    one test, no relations
+    get_tests_expanded           one test with questions.answers
+    get_tests_page               keyset page of `--limit` tests
+    get_tests_page_fields        the same page with fields=title (id and title only)
+    get_test_version             the ETag query of GET /test/?test_id= (304 path)
+    get_test_payload_miss/_hit   ETag query + the cached JSON of GET /test/?test_id=
+    get_summaries                result statistics of one test
+    answer_key_grade             cached answer key + grading one attempt
+    get_results_page             first page of a test's results
+
+    cd src && python -m benchmarks.seed && python -m benchmarks.repositories --number 200
+"""
+import argparse
+import asyncio
+import itertools
+import sys
+
+from benchmarks.utils import latency_summary, report, timer
+
+
+EXPANDED = frozenset({"questions", "questions.answers"})
+
+# SQL-інструкцій на один виклик, не більше: зайвий round-trip провалює бенчмарк
+QUERY_BUDGETS = {
+    "get_tests": 1,
+    "get_tests_expanded": 3,  # тести + selectinload питань + selectinload відповідей
+    "get_tests_page": 1,
+    "get_tests_page_fields": 1,
+    "get_test_version": 1,
+    "get_test_payload_miss": 4,  # версія + дерево тесту
+    "get_test_payload_hit": 1,  # лише версія
+    "get_summaries": 1,
+    "answer_key_grade": 1,  # лише при промаху кешу ключа
+    "get_results_page": 1,
+}
+
+
+async def measure(number: int, test_ids: list[int], call, prepare=None, budget: int | None = None) -> dict:
+    """Times `call(test_id)` only; `prepare(test_id)` runs outside the timer"""
+    from instrumentation import QueryBudgetExceeded, track_queries
+
+    latencies, queries, exceeded = [], 0, None
+    for test_id in itertools.islice(itertools.cycle(test_ids), number):
+        if prepare is not None:
+            await prepare(test_id)
+        try:
+            with track_queries(budget=budget) as stats, timer() as t:
+                await call(test_id)
+        except QueryBudgetExceeded as error:
+            exceeded = str(error)
+        latencies.append(t["elapsed"])
+        queries = max(queries, stats.queries)
+    result = {"queries": queries, "query_budget": budget, **latency_summary(latencies)}
+    if exceeded is not None:
+        result["budget_exceeded"] = exceeded
+    return result
+
+
+async def main(args) -> None:
+    from sqlalchemy import func, select
+    from benchmarks.seed import seeded_test_ids
+    from cache import test_cache
+    from database import session_factory
+    from database.models import Answer, Question
+    from grading import answer_key_cache
+    from repositories.test_repository import TestRepository
+    from repositories.test_result_repository import TestResultRepository
+
+    tests, results = TestRepository(), TestResultRepository()
+    async with session_factory() as session:
+        test_ids = await seeded_test_ids(session, args.prefix)
+        if not test_ids:
+            raise SystemExit("No seeded tests: run `python -m benchmarks.seed` first")
+
+        # Одна спроба на тест: перша відповідь кожного питання
+        attempts = {test_id: [] for test_id in test_ids}
+        rows = await session.execute(
+            select(Question.test_id, func.min(Answer.id))
+            .join(Answer, Answer.question_id == Question.id)
+            .where(Question.test_id.in_(test_ids))
+            .group_by(Question.id)
+        )
+        for test_id, answer_id in rows:
+            attempts[test_id].append(answer_id)
+
+        async def payload(test_id: int) -> None:
+            version = await tests.get_test_version(session, test_id, EXPANDED)
+            await tests.get_test_payload(session, test_id, EXPANDED, version)
+
+        async def grade(test_id: int) -> None:
+            answer_key = await answer_key_cache.get(session, test_id)
+            answer_key.grade(attempts[test_id])
+
+        cases = {
+            "get_tests": (lambda test_id: tests.get_tests(session, 0, 1, test_id), None),
+            "get_tests_expanded": (lambda test_id: tests.get_tests(session, 0, 1, test_id, EXPANDED), None),
+            "get_tests_page": (lambda test_id: tests.get_tests_page(session, test_id, args.limit), None),
+            "get_tests_page_fields": (
+                lambda test_id: tests.get_tests_page(session, test_id, args.limit, fields={"title"}),
+                None,
+            ),
+            "get_test_version": (lambda test_id: tests.get_test_version(session, test_id, EXPANDED), None),
+            "get_test_payload_miss": (payload, test_cache.invalidate),
+            "get_test_payload_hit": (payload, None),
+            "get_summaries": (lambda test_id: results.get_summaries(session, [test_id]), None),
+            "answer_key_grade": (grade, None),
+            "get_results_page": (lambda test_id: results.get_results_page(session, test_id, None, args.limit), None),
+        }
+        measured = {}
+        for name, (call, prepare) in cases.items():
+            await measure(min(args.number, 10), test_ids, call, prepare)  # warm-up
+            measured[name] = await measure(args.number, test_ids, call, prepare, QUERY_BUDGETS[name])
+            session.expunge_all()
+
+    report("repositories", {"tests": len(test_ids), "number": args.number, "limit": args.limit, "cases": measured})
+    over = [name for name, result in measured.items() if "budget_exceeded" in result]
+    if over:
+        for name in over:
+            print(f"{name}: {measured[name]['budget_exceeded']}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200, help="calls per case")
+    parser.add_argument("--limit", type=int, default=20, help="page size of the paginated cases")
+    parser.add_argument("--prefix", default="benchmark", help="title prefix of the seeded tests")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,83 @@
+"""
+Latency of concurrent GET /test/ while S3 uploads are in flight.
+
+The app runs in-process (httpx ASGITransport) against the Postgres from
+DATABASE_URL; S3 is replaced by a moto server started on the fly.
+
+    cd src && python -m benchmarks.s3_latency --requests 300 --uploads 20
+"""
+import argparse
+import asyncio
+import io
+import os
+import time
+
+from benchmarks.utils import start_s3_stand_in
+
+
+async def timed_gets(client, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get("/test/", params={"limit": 10})
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+async def uploads(count: int, size: int) -> None:
+    from starlette.datastructures import UploadFile
+    from s3_actions import S3Client
+
+    s3_client = S3Client()
+    payload = os.urandom(size)
+    await asyncio.gather(*(
+        s3_client.upload_file(
+            UploadFile(io.BytesIO(payload), filename=f"bench_{i}.bin"),
+            key=f"benchmark/{i}.bin",
+        )
+        for i in range(count)
+    ))
+
+
+async def main(args) -> None:
+    import httpx
+    from main import app
+    from s3_actions import S3Client
+    from benchmarks.utils import latency_summary, report
+
+    S3Client.client.create_bucket(Bucket=S3Client.bucket_name)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await timed_gets(client, args.concurrency, args.concurrency)  # warm-up
+        idle = await timed_gets(client, args.requests, args.concurrency)
+
+        upload_task = asyncio.create_task(uploads(args.uploads, args.upload_size))
+        busy = await timed_gets(client, args.requests, args.concurrency)
+        await upload_task
+
+    report("s3_latency", {
+        "uploads": args.uploads,
+        "upload_size": args.upload_size,
+        "idle": latency_summary(idle),
+        "during_uploads": latency_summary(busy),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--upload-size", type=int, default=150 * 1024)
+    parser.add_argument("--moto-port", type=int, default=5055)
+    args = parser.parse_args()
+
+    start_s3_stand_in(args.moto_port)
+    asyncio.run(main(args))
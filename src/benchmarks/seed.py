@@ -0,0 +1,144 @@
+"""
+Seed the database with benchmark data through the ORM models.
+
+Creates `--tests` tests, each with `--questions` questions of `--answers`
+answers and `--results` results, as Test/Question/Answer/TestResult
+objects (relationships included), committed in batches. Seeded tests are
+titled with `--prefix`, so `--reset` can remove them again (ON DELETE
+CASCADE takes the children), and the description of each records the
+sizes it was built with. Seeding is idempotent: only the missing tests
+are added, so the suite runner can call it before every run; when tests
+of other sizes (or more tests) exist under the prefix, they are all
+removed and reseeded, so one prefix never mixes two data sets.
+
+    cd src && python -m benchmarks.seed --tests 1000 --questions 20 --answers 4 --results 50
+"""
+import argparse
+import asyncio
+import random
+
+from sqlalchemy import delete, func, select
+
+from benchmarks.utils import report, timer
+
+
+def describe(questions: int, answers: int, results: int) -> str:
+    """Description of every seeded test: the sizes it was built with"""
+    return f"Seeded benchmark test: {questions} questions x {answers} answers, {results} results"
+
+
+def build_test(index: int, questions: int, answers: int, results: int, prefix: str):
+    from database.models import Answer, Question, Test, TestResult
+
+    return Test(
+        title=f"{prefix} {index}",
+        description=describe(questions, answers, results),
+        questions=[
+            Question(
+                title=f"Question {q}",
+                description="Which of these are correct?",
+                answers=[
+                    Answer(
+                        text=f"Answer {a}",
+                        points=float(a + 1),
+                        is_correct=a % 2 == 0,
+                        is_required=a == 0,
+                    )
+                    for a in range(answers)
+                ],
+            )
+            for q in range(questions)
+        ],
+        results=[
+            TestResult(
+                username=f"user {r}",
+                user_email=f"user{r}@example.com",
+                grade=round(random.uniform(0, questions * answers), 2),
+            )
+            for r in range(results)
+        ],
+    )
+
+
+async def seed(session, tests: int, questions: int, answers: int, results: int,
+               prefix: str = "benchmark", start: int = 0, batch_size: int = 50) -> None:
+    """Adds the tests with all their children, one commit per batch"""
+    random.seed(start)
+    for first in range(start, start + tests, batch_size):
+        session.add_all([
+            build_test(index, questions, answers, results, prefix)
+            for index in range(first, min(first + batch_size, start + tests))
+        ])
+        await session.commit()
+        session.expunge_all()
+
+
+async def seeded_test_ids(session, prefix: str = "benchmark") -> list[int]:
+    from database.models import Test
+
+    return list(await session.scalars(
+        select(Test.id).where(Test.title.startswith(f"{prefix} ")).order_by(Test.id)
+    ))
+
+
+async def seeded_descriptions(session, prefix: str = "benchmark") -> set[str]:
+    from database.models import Test
+
+    return set(await session.scalars(
+        select(Test.description).where(Test.title.startswith(f"{prefix} ")).distinct()
+    ))
+
+
+async def reset(session, prefix: str = "benchmark") -> int:
+    from database.models import Test
+
+    deleted = await session.execute(delete(Test).where(Test.title.startswith(f"{prefix} ")))
+    await session.commit()
+    return deleted.rowcount
+
+
+async def main(args) -> None:
+    from database import session_factory
+    from database.models import Answer, Question, Test, TestResult
+
+    async with session_factory() as session:
+        expected = describe(args.questions, args.answers, args.results)
+        existing = len(await seeded_test_ids(session, args.prefix))
+        # Дані інших розмірів під тим самим префіксом зробили б результати непорівнюваними
+        stale = await seeded_descriptions(session, args.prefix) - {expected}
+        removed = 0
+        if args.reset or stale or existing > args.tests:
+            removed = await reset(session, args.prefix)
+            existing = 0
+        with timer() as t:
+            if existing < args.tests:
+                await seed(session, args.tests - existing, args.questions, args.answers,
+                           args.results, args.prefix, start=existing)
+        test_ids = await seeded_test_ids(session, args.prefix)
+
+        counts = {}
+        for model in (Test, Question, Answer, TestResult):
+            counts[model.__tablename__] = await session.scalar(select(func.count()).select_from(model))
+
+    report("seed", {
+        "prefix": args.prefix,
+        "removed_tests": removed,
+        "added_tests": max(0, args.tests - existing),
+        "seeded_tests": len(test_ids),
+        "first_test_id": test_ids[0] if test_ids else None,
+        "last_test_id": test_ids[-1] if test_ids else None,
+        "seconds": round(t["elapsed"], 3),
+        "table_rows": counts,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tests", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--answers", type=int, default=4)
+    parser.add_argument("--results", type=int, default=50)
+    parser.add_argument("--prefix", default="benchmark")
+    parser.add_argument("--reset", action="store_true",
+                        help="delete previously seeded tests first (done anyway when their sizes differ)")
+    asyncio.run(main(parser.parse_args()))
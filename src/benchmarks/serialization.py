@@ -0,0 +1,105 @@
+"""
+Serialization of a large nested test (questions x answers) to Pydantic.
+
+Compares the compiled Base.to_pydantic with the previous recursive
+getattr-based implementation, and FastAPI's response_model re-validation
+with SchemaJSONResponse. Works on transient objects, no database needed.
+
+    cd src && python -m benchmarks.serialization --questions 100 --answers 5
+"""
+import argparse
+from datetime import datetime
+from typing import get_args
+
+
+def legacy_to_pydantic(obj):
+    """Попередня реалізація Base.to_pydantic — еталон для порівняння"""
+    from database.models import Base
+
+    schema_class = obj.Schema
+    schema_data = {}
+    for field in schema_class.model_fields:
+        value = getattr(obj, field, None)
+        if isinstance(value, list):
+            get_args(schema_class.model_fields[field].annotation)
+            schema_data[field] = [legacy_to_pydantic(item) for item in value]
+        elif isinstance(value, Base):
+            schema_data[field] = legacy_to_pydantic(value)
+        else:
+            schema_data[field] = value
+    return schema_class(**schema_data)
+
+
+def build_test(questions: int, answers: int):
+    from database.models import Answer, Question, Test
+
+    now = datetime.now()
+    test = Test(id=1, title="benchmark", description="nested", created_at=now, updated_at=now)
+    for q in range(questions):
+        question = Question(
+            id=q, title=f"question {q}", description=None, s3_file_path=None,
+            test_id=1, created_at=now, updated_at=now,
+        )
+        question.answers = [
+            Answer(
+                id=q * answers + a, text=f"answer {a}", s3_file_path=None, points=1.0,
+                is_correct=a == 0, is_required=False, question_id=q,
+                created_at=now, updated_at=now,
+            )
+            for a in range(answers)
+        ]
+        test.questions.append(question)
+    return test
+
+
+def fastapi_response(loop, schemas, field) -> bytes:
+    """Шлях FastAPI для response_model: повторна валідація, jsonable_encoder, json.dumps"""
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+
+    content = loop.run_until_complete(serialize_response(field=field, response_content=schemas))
+    return JSONResponse(content).body
+
+
+def main(args) -> None:
+    import asyncio
+    import timeit
+    from typing import List
+    from fastapi.utils import create_model_field
+    from database.schemas import TestSchema
+    from json_responses import SchemaJSONResponse
+    from benchmarks.utils import report
+
+    def best(func) -> float:
+        return min(timeit.repeat(func, number=args.number, repeat=5)) / args.number
+
+    test = build_test(args.questions, args.answers)
+    assert test.to_pydantic().model_dump() == legacy_to_pydantic(test).model_dump()
+
+    legacy = best(lambda: legacy_to_pydantic(test))
+    compiled = best(test.to_pydantic)
+
+    schemas = [test.to_pydantic()]
+    field = create_model_field(name="Response", type_=List[TestSchema], mode="serialization")
+    loop = asyncio.new_event_loop()
+    revalidated = best(lambda: fastapi_response(loop, schemas, field))
+    direct = best(lambda: SchemaJSONResponse(schemas).body)
+
+    report("serialization", {
+        "questions": args.questions,
+        "answers_per_question": args.answers,
+        "legacy_ms": round(legacy * 1000, 3),
+        "compiled_ms": round(compiled * 1000, 3),
+        "speedup": round(legacy / compiled, 2),
+        "response_model_ms": round(revalidated * 1000, 3),
+        "schema_json_response_ms": round(direct * 1000, 3),
+        "response_speedup": round(revalidated / direct, 2),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--answers", type=int, default=5)
+    parser.add_argument("--number", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,51 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Percentile (nearest-rank) of a list of numbers"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_summary(values: list[float]) -> dict:
+    """p50/p90/p99/max in milliseconds"""
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p90_ms": round(percentile(values, 90) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+    }
+
+
+@contextmanager
+def timer():
+    """Yields a dict whose "elapsed" key is filled in on exit"""
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["elapsed"] = time.perf_counter() - start
+
+
+def report(name: str, data: dict) -> None:
+    """Prints one machine-readable JSON line per benchmark"""
+    print(json.dumps({"benchmark": name, **data}), flush=True)
+
+
+def start_s3_stand_in(port: int) -> None:
+    """Starts a moto S3 server in a thread; the app and child processes use it via the environment"""
+    from moto.server import ThreadedMotoServer
+
+    server = ThreadedMotoServer(port=port)
+    server.start()
+    os.environ["AWS_ENDPOINT_URL"] = f"http://127.0.0.1:{port}"
+    os.environ.setdefault("BUCKET_NAME", "benchmark")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
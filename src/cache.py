@@ -0,0 +1,150 @@
+import logging
+import time
+from collections import OrderedDict
+from functools import cached_property
+from typing import Any, Iterable, Protocol
+from config import settings
+from metrics import TEST_CACHE_HITS, TEST_CACHE_INVALIDATIONS, TEST_CACHE_MISSES
+
+
+logger = logging.getLogger(__name__)
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def incr(self, key: str) -> int: ...
+
+
+class LRUCacheBackend:
+    """Кеш у пам'яті процесу: LRU з TTL для значень, лічильники версій не витісняються"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> Any | None:
+        if key in self.counters:
+            return str(self.counters[key]).encode()
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+
+class RedisCacheBackend:
+    """Спільний для всіх воркерів кеш (redis.asyncio або сумісний фейк, напр. fakeredis)"""
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        from redis.asyncio import Redis
+        return cls(Redis.from_url(url))
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=int(ttl * 1000))
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+
+class TestCache:
+    """
+        Read-through кеш JSON-представлень тестів.
+        Ключ містить версію тесту: запис просто збільшує версію, і всі
+        закешовані варіанти (з різними expand) стають недосяжними. Крім того,
+        ключ містить версію тесту з БД (з неї ж будується ETag), тож і кеш воркера,
+        що не бачив інвалідації, не віддасть застарілий тест.
+    """
+
+    def __init__(self, backend: CacheBackend | None = None, ttl: float | None = None):
+        if backend is not None:
+            self.backend = backend
+        if ttl is not None:
+            self.ttl = ttl
+
+    @cached_property
+    def backend(self) -> CacheBackend:
+        """Якщо бекенд не передано — він береться з налаштувань при першому зверненні, а не при імпорті"""
+        if settings.cache.cache_redis_url:
+            return RedisCacheBackend.from_url(settings.cache.cache_redis_url)
+        return LRUCacheBackend(settings.cache.cache_max_entries)
+
+    @cached_property
+    def ttl(self) -> float:
+        return settings.cache.cache_ttl
+
+    async def version(self, test_id: int) -> int:
+        """Поточна версія тесту; змінюється при кожному записі в тест, питання чи відповіді"""
+        return int(await self.backend.get(f"test:{test_id}:version") or 0)
+
+    async def _key(self, test_id: int, expand: Iterable[str], db_version: str) -> str:
+        expand = sorted(expand)
+        key = f"test:{test_id}:v{await self.version(test_id)}"
+        if "results_summary" in expand:
+            # Спроби змінюють лише підсумок результатів: він має окрему версію,
+            # тож нові спроби не скидають варіанти тесту без results_summary
+            key += f":r{int(await self.backend.get(f'test:{test_id}:results_version') or 0)}"
+        return f"{key}:{','.join(expand)}:{db_version}"
+
+    async def get(self, test_id: int, expand: Iterable[str], db_version: str) -> tuple[str | None, bytes | None]:
+        """
+            Повертає ключ (для подальшого set) і закешоване значення або None.
+            Недоступний кеш — це промах, а не помилка запиту.
+        """
+        try:
+            key = await self._key(test_id, expand, db_version)
+            value = await self.backend.get(key)
+        except Exception:
+            logger.exception("Test cache read failed")
+            key, value = None, None
+        (TEST_CACHE_MISSES if value is None else TEST_CACHE_HITS).inc()
+        return key, value
+
+    async def set(self, key: str | None, value: bytes) -> None:
+        if key is None:
+            return
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception:
+            logger.exception("Test cache write failed")
+
+    async def invalidate(self, test_id: int) -> None:
+        """Викликається після коміту; якщо кеш недоступний, запис застаріє не пізніше ніж через ttl"""
+        await self._bump(f"test:{test_id}:version")
+
+    async def invalidate_results(self, test_id: int) -> None:
+        """Нові спроби: скидаються лише варіанти з expand=results_summary"""
+        await self._bump(f"test:{test_id}:results_version")
+
+    async def _bump(self, counter: str) -> None:
+        try:
+            await self.backend.incr(counter)
+        except Exception:
+            logger.exception("Test cache invalidation failed")
+        TEST_CACHE_INVALIDATIONS.inc()
+
+
+test_cache = TestCache()
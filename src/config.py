@@ -1,3 +1,7 @@
+import os
+from functools import cached_property
+from typing import Literal, Optional
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,6 +16,16 @@ class PostgresDatabaseSettings(CommonSettings):
     postgres_user: str
     postgres_password: str
     database_url: str
+    db_pool_size: int = 5  # Connections kept open per process
+    db_max_overflow: int = 5  # Extra connections opened under load and closed when returned
+    db_pool_timeout: float = 30.0  # Seconds to wait for a free connection before failing
+    db_pool_recycle: int = 1800  # Reopen connections older than this, seconds (-1 disables)
+    db_pool_pre_ping: bool = False  # Ping on checkout: survives DB restarts at one round-trip per checkout
+    db_statement_cache_size: int = 100  # asyncpg prepared statements per connection (0 behind pgbouncer)
+    db_pool_warm_connections: Optional[int] = None  # Opened at startup before readiness (default: db_pool_size)
+    # Budget for all workers of one server.py instance, pools are divided per worker. The default stays under
+    # Postgres's max_connections=100 with room for migrations and admin sessions; 0 disables the split
+    db_max_connections: int = 80
 
 
 class SMTPSettings(CommonSettings):
@@ -25,17 +39,93 @@ class AWSSettings(CommonSettings):
     bucket_name: str
     aws_access_key_id: str
     aws_secret_access_key: str
+    aws_endpoint_url: Optional[str] = None  # Local S3 stand-in (moto, minio)
+    s3_max_workers: int = 10  # Threads (and pooled HTTP connections) for S3 calls
+    s3_max_file_size: int = 200 * 1024 * 1024  # 200 MB
+    s3_chunk_size: int = Field(5 * 1024 * 1024, ge=5 * 1024 * 1024)  # Multipart part size (S3 minimum is 5 MB)
+    s3_presigned_url_expires: int = 3600  # Lifetime of presigned URLs, seconds
+    s3_outbox_poll_interval: float = 5.0  # Seconds between deletion outbox drains
+    s3_outbox_max_attempts: int = 10  # After that a key stays in the outbox for manual review
+
+
+class ServerSettings(CommonSettings):
+    web_host: str = "0.0.0.0"
+    web_port: int = 8080
+    web_workers: int = 0  # Worker processes; 0 means one per CPU core
+    web_loop: Literal["auto", "asyncio", "uvloop"] = "auto"  # auto picks uvloop when installed
+    web_http: Literal["auto", "h11", "httptools"] = "auto"  # auto picks httptools when installed
+    web_keep_alive: int = 5  # Seconds an idle keep-alive connection stays open
+    web_backlog: int = 2048  # Pending connections queued by the kernel
+    web_limit_max_requests: Optional[int] = None  # Restart a worker after this many requests
+
+    @property
+    def workers(self) -> int:
+        return self.web_workers or os.cpu_count() or 1
+
+    @property
+    def processes(self) -> int:
+        """
+            Processes serving this instance: server.py exports WEB_WORKERS to its workers,
+            anything else (`uvicorn main:app`, benchmarks, CLI) is a single process.
+        """
+        return self.web_workers or 1
+
+
+class CacheSettings(CommonSettings):
+    cache_ttl: float = 60.0  # Seconds a cached test payload stays valid
+    cache_max_entries: int = 1024  # In-process LRU size
+    # Shared cache for all workers. Without it every worker fills its own LRU (test payloads are keyed
+    # by their database version, so they are not stale) and answer keys are read on every submit
+    cache_redis_url: Optional[str] = None
+
+
+class AppSettings(CommonSettings):
+    log_level: str = "INFO"  # DEBUG adds per-request session logging
+    log_json: bool = False  # One JSON object per log line instead of plain text
+    shutdown_readiness_delay: float = 5.0  # After SIGTERM /readyz returns 503 this long before the server stops accepting
+    shutdown_drain_timeout: float = 25.0  # Then seconds to finish in-flight requests and background tasks, in total
+    sql_query_budget: int = 0  # Max SQL statements per HTTP request, 0 = no budget
+    sql_repeat_threshold: int = 5  # The same statement this many times in one request is reported as N+1, 0 = off
+    sql_strict: bool = False  # CI/debug: budget and N+1 violations return 500 with details instead of a warning
 
 
 class Settings:
-    db: PostgresDatabaseSettings = PostgresDatabaseSettings()
-    aws: AWSSettings = AWSSettings()
-    smtp: SMTPSettings = SMTPSettings()
+    """
+        Each section reads the environment on first access, so importing config
+        (alembic, CLI, test collection) does not require or parse every variable.
+    """
+
+    @cached_property
+    def app(self) -> AppSettings:
+        return AppSettings()
+
+    @cached_property
+    def db(self) -> PostgresDatabaseSettings:
+        return PostgresDatabaseSettings()
+
+    @cached_property
+    def aws(self) -> AWSSettings:
+        return AWSSettings()
+
+    @cached_property
+    def smtp(self) -> SMTPSettings:
+        return SMTPSettings()
+
+    @cached_property
+    def server(self) -> ServerSettings:
+        return ServerSettings()
+
+    @cached_property
+    def cache(self) -> CacheSettings:
+        return CacheSettings()
 
 
 settings: Settings = Settings()
 
 if __name__ == "__main__":
+    print(settings.app.model_dump())
     print(settings.db.model_dump())
     print(settings.aws.model_dump())
-    print(settings.smtp.model_dump())
\ No newline at end of file
+    print(settings.smtp.model_dump())
+    print(settings.server.model_dump())
+    print(settings.cache.model_dump())
\ No newline at end of file
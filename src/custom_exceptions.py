@@ -24,6 +24,14 @@ class QuestionEntityException(EntityException):
     """Базовий виняток для Question"""
     pass
 
+class AnswerEntityException(EntityException):
+    """Базовий виняток для Answer"""
+    pass
+
+class TestResultEntityException(EntityException):
+    """Базовий виняток для TestResult"""
+    pass
+
 Exc = TypeVar("Exc", bound=EntityException)
 
 def create_exception_class(entity: str, action: ActionEnum, exception_class: Type[Exc]) -> Type[Exc]:
@@ -42,3 +50,10 @@ TestUpdateException = create_exception_class("test", ActionEnum.UPDATE, TestEnti
 QuestionCreateException = create_exception_class("question", ActionEnum.CREATE, QuestionEntityException)
 QuestionDeleteException = create_exception_class("question", ActionEnum.DELETE, QuestionEntityException)
 QuestionUpdateException = create_exception_class("question", ActionEnum.UPDATE, QuestionEntityException)
+
+AnswerCreateException = create_exception_class("answer", ActionEnum.CREATE, AnswerEntityException)
+AnswerDeleteException = create_exception_class("answer", ActionEnum.DELETE, AnswerEntityException)
+AnswerUpdateException = create_exception_class("answer", ActionEnum.UPDATE, AnswerEntityException)
+
+TestResultCreateException = create_exception_class("test result", ActionEnum.CREATE, TestResultEntityException)
+TestResultGetException = create_exception_class("test result", ActionEnum.GET, TestResultEntityException)
\ No newline at end of file
@@ -1,8 +1,17 @@
-from .database import engine, session_factory, session_getter, SessionDep
+from .database import dispose_engine, get_engine, pool_limits, session_factory, session_getter, SessionDep
 
 __all__ = (
+    "dispose_engine",
     "engine",
+    "get_engine",
+    "pool_limits",
     "session_factory",
     "session_getter",
     "SessionDep"
-)
\ No newline at end of file
+)
+
+
+def __getattr__(name: str):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
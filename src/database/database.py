@@ -1,33 +1,136 @@
+import logging
+import time
+from functools import lru_cache
 from typing import Annotated, AsyncGenerator
 from fastapi import Depends
+from sqlalchemy import AsyncAdaptedQueuePool, event
 from sqlalchemy.ext.asyncio import (
     create_async_engine, 
     AsyncEngine, async_sessionmaker, AsyncSession)
 from config import settings
+from instrumentation import instrument_engine
+from metrics import (
+    DB_POOL_CHECKED_IN,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUTS,
+    DB_POOL_CONNECTS,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_WAIT,
+)
 
 
 
-# Create an asynchronous engine for the database connection
-engine: AsyncEngine = create_async_engine(
-    url=settings.db.database_url,
-    echo=False,
-    echo_pool=False,
-    pool_size=5,
-    max_overflow=5,
-    pool_timeout=30,  # Connection timeout
-    pool_recycle=30,  # Connection lifetime (30 seconds)
-)
+logger = logging.getLogger(__name__)
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """
+        Пул, що вимірює, скільки запит чекає на з'єднання (разом із відкриттям нового),
+        і оновлює gauge стану пулу при кожній видачі й поверненні з'єднання
+        (set_function не працює в multiprocess-режимі prometheus_client).
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+            self.update_gauges()
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self.update_gauges()
+
+    def update_gauges(self) -> None:
+        DB_POOL_SIZE.set(self.size())
+        DB_POOL_CHECKED_OUT.set(self.checkedout())
+        DB_POOL_CHECKED_IN.set(self.checkedin())
+        DB_POOL_OVERFLOW.set(self.overflow())
+
+
+# SQLAlchemy приглушує до WARN лише логери "sqlalchemy.*", а пул-нащадок логує під іменем цього модуля
+logging.getLogger(f"{MeteredQueuePool.__module__}.{MeteredQueuePool.__name__}").setLevel(logging.WARNING)
+
+
+def pool_limits() -> tuple[int, int]:
+    """
+        (pool_size, max_overflow) одного воркера. Якщо задано db_max_connections,
+        бюджет ділиться між воркерами server.py, щоб усі разом не перевищили max_connections
+        Postgres; окремий процес (`uvicorn main:app`, бенчмарки) — це один воркер.
+    """
+    pool_size, max_overflow = settings.db.db_pool_size, settings.db.db_max_overflow
+    if settings.db.db_max_connections:
+        per_worker = max(1, settings.db.db_max_connections // settings.server.processes)
+        pool_size = min(pool_size, per_worker)
+        max_overflow = min(max_overflow, per_worker - pool_size)
+    return pool_size, max_overflow
+
+
+def create_engine() -> AsyncEngine:
+    """Create an asynchronous engine for the database connection (no connection is opened yet)"""
+    pool_size, max_overflow = pool_limits()
+    engine = create_async_engine(
+        url=settings.db.database_url,
+        echo=False,
+        echo_pool=False,
+        poolclass=MeteredQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db.db_pool_timeout,  # Connection timeout
+        pool_recycle=settings.db.db_pool_recycle,  # Connection lifetime
+        pool_pre_ping=settings.db.db_pool_pre_ping,
+        connect_args={
+            # Кеш prepared statements asyncpg і SQLAlchemy; 0 вимикає обидва (pgbouncer у transaction mode)
+            "statement_cache_size": settings.db.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db.db_statement_cache_size,
+        },
+    )
+
+    engine.pool.update_gauges()
+    event.listen(engine.sync_engine, "connect", lambda *args: DB_POOL_CONNECTS.inc())
+    event.listen(engine.sync_engine, "checkout", lambda *args: DB_POOL_CHECKOUTS.inc())
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> AsyncEngine:
+    """Engine створюється при першому зверненні (у lifespan або першою сесією), а не при імпорті"""
+    return create_engine()
+
+
+async def dispose_engine() -> None:
+    """Закриває всі з'єднання пулу, якщо engine взагалі створювався"""
+    if get_engine.cache_info().currsize:
+        await get_engine().dispose()
+
+
+class LazySessionMaker(async_sessionmaker[AsyncSession]):
+    """Фабрика сесій, що прив'язується до engine під час створення першої сесії"""
+
+    def __call__(self, **local_kw) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
 
 
 # Create a session factory for generating asynchronous sessions
-session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
-    bind=engine,
+session_factory: async_sessionmaker[AsyncSession] = LazySessionMaker(
     autoflush=False,
     class_=AsyncSession,
     autocommit=False,
     expire_on_commit=False
 )
 
+
+def __getattr__(name: str):
+    # `from database import engine` лишається робочим, але вже не створює engine під час імпорту модуля
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 async def session_getter() -> AsyncGenerator[AsyncSession, None]:
     """
         Asynchronous generator function that provides
@@ -37,7 +140,7 @@ async def session_getter() -> AsyncGenerator[AsyncSession, None]:
         try:
             yield session
         finally:
-            print("SESSION CLOSED IN session_getter!", flush=True)
+            logger.debug("Session closed in session_getter")
             await session.close()
 
 
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import List, Optional, TypeVar, get_args
+from typing import Callable, List, Optional, TypeVar
 from pydantic import BaseModel
-from sqlalchemy import TIMESTAMP, ForeignKey, func
+from sqlalchemy import TIMESTAMP, ForeignKey, Index, func, inspect
 from sqlalchemy.orm import (
     Mapped,
     DeclarativeBase,
@@ -17,25 +17,59 @@ class Base(DeclarativeBase):
     __abstract__ = True
     id: Mapped[int] = mapped_column(primary_key=True)
 
-    def to_pydantic(self: ModelType) -> BaseModel:
-        """Automatically converts SQLAlchemy model to Pydantic schema"""
-        schema_class = getattr(self.__class__, "Schema", None)
+    @classmethod
+    def _build_serializer(cls) -> Callable[["Base"], dict]:
+        """
+            Один раз для пари модель/схема визначає, які поля схеми є колонками,
+            а які — зв'язками, і повертає функцію, що будує dict для схеми без getattr-проб.
+        """
+        schema_class = getattr(cls, "Schema", None)
 
         if not schema_class:
-            raise ValueError(f"Pydantic-schema for {self.__class__.__name__} not defined")
-        
-        schema_data = {}
-        for field in schema_class.model_fields:
-            value = getattr(self, field, None)
-            if isinstance(value, list):
-                related_schema = get_args(schema_class.model_fields[field].annotation)[0]
-                schema_data[field] = [item.to_pydantic() for item in value]
-            elif isinstance(value, Base):
-                schema_data[field] = value.to_pydantic()
-            else:
-                schema_data[field] = value
-        
-        return schema_class(**schema_data)
+            raise ValueError(f"Pydantic-schema for {cls.__name__} not defined")
+
+        mapper = inspect(cls)
+        columns = [field for field in schema_class.model_fields if field in mapper.column_attrs]
+        relationships = [
+            (field, mapper.relationships[field].uselist)
+            for field in schema_class.model_fields
+            if field in mapper.relationships
+        ]
+        # Поля схеми, яких немає в моделі (напр. results_summary), лишаються за замовчуванням
+
+        def serialize(obj: "Base") -> dict:
+            loaded = obj.__dict__
+            try:
+                schema_data = {field: loaded[field] for field in columns}
+            except KeyError:
+                # Прострочені колонки довантажуються через getattr, як і раніше
+                schema_data = {field: getattr(obj, field) for field in columns}
+
+            for field, uselist in relationships:
+                # Незавантажені зв'язки не чіпаємо (це був би lazy load), а віддаємо як None
+                value = loaded.get(field)
+                if value is None:
+                    schema_data[field] = None
+                elif uselist:
+                    schema_data[field] = [item.to_dict() for item in value]
+                else:
+                    schema_data[field] = value.to_dict()
+            return schema_data
+
+        return serialize
+
+    def to_dict(self) -> dict:
+        """Дані для Pydantic-схеми моделі (рекурсивно для завантажених зв'язків)"""
+        cls = self.__class__
+        serializer = cls.__dict__.get("_serializer")
+        if serializer is None:
+            serializer = cls._build_serializer()
+            cls._serializer = serializer
+        return serializer(self)
+
+    def to_pydantic(self: ModelType) -> BaseModel:
+        """Converts SQLAlchemy model to Pydantic schema: the whole tree is validated in one pydantic-core call"""
+        return self.Schema.model_validate(self.to_dict())
 
 
 class Test(Base):
@@ -47,8 +81,8 @@ class Test(Base):
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
-    questions: Mapped[List["Question"]] = relationship('Question', back_populates='test')
-    results: Mapped[List["TestResult"]] = relationship('TestResult', back_populates='test')
+    questions: Mapped[List["Question"]] = relationship('Question', back_populates='test', passive_deletes=True)
+    results: Mapped[List["TestResult"]] = relationship('TestResult', back_populates='test', passive_deletes=True)
 
 class Question(Base):
     __tablename__ = "question"
@@ -60,10 +94,10 @@ class Question(Base):
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
-    test_id: Mapped[int] = mapped_column(ForeignKey('test.id'))
+    test_id: Mapped[int] = mapped_column(ForeignKey('test.id', ondelete='CASCADE'), index=True)
     test: Mapped["Test"] = relationship('Test', back_populates='questions')
 
-    answers: Mapped[List["Answer"]] = relationship('Answer', back_populates='question')
+    answers: Mapped[List["Answer"]] = relationship('Answer', back_populates='question', passive_deletes=True)
 
 class Answer(Base):
     __tablename__ = "answer"
@@ -77,11 +111,16 @@ class Answer(Base):
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
-    question_id: Mapped[int] = mapped_column(ForeignKey('question.id'))
+    question_id: Mapped[int] = mapped_column(ForeignKey('question.id', ondelete='CASCADE'), index=True)
     question: Mapped["Question"] = relationship('Question', back_populates='answers')
 
 class TestResult(Base):
     __tablename__ = "test_result"
+    __table_args__ = (
+        # Keyset-пагінація результатів тесту та фільтр за датою
+        Index("ix_test_result_test_id_id", "test_id", "id"),
+        Index("ix_test_result_test_id_created_at", "test_id", "created_at"),
+    )
     Schema = TestResultSchema
 
     username: Mapped[str]
@@ -89,5 +128,16 @@ class TestResult(Base):
     grade: Mapped[float]
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
 
-    test_id: Mapped[int] = mapped_column(ForeignKey('test.id'))
+    test_id: Mapped[int] = mapped_column(ForeignKey('test.id', ondelete='CASCADE'))
     test: Mapped["Test"] = relationship('Test', back_populates='results')
+
+
+class S3DeletionOutbox(Base):
+    """Черга S3-ключів на видалення: записується в тій самій транзакції, що й зміни в БД"""
+    __tablename__ = "s3_deletion_outbox"
+
+    key: Mapped[str]
+    attempts: Mapped[int] = mapped_column(default=0, server_default="0")
+    last_error: Mapped[Optional[str]]
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
+    next_attempt_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now(), index=True)
@@ -1,12 +1,27 @@
-from .answer_schemas import AnswerCreateSchema, AnswerSchema, AnswerUpdateSchema
+from .answer_schemas import AnswerCreateSchema, AnswerSchema, AnswerUpdateSchema, AnswerUpsertSchema
+from .attachment_schemas import PresignedUploadSchema
+from .bulk_schemas import BulkResultSchema, BulkRowErrorSchema
+from .import_schemas import AnswerImportSchema, QuestionImportSchema, TestImportSchema
+from .pagination_schemas import PageSchema
 from .question_schemas import QuestionCreateSchema, QuestionSchema, QuestionUpdateSchema
-from .test_schemas import TestCreateSchema, TestSchema, TestUpdateSchema
-from .test_result_schemas import TestResultSchema
+from .test_schemas import TestCreateSchema, TestSchema, TestSummarySchema, TestUpdateSchema
+from .test_result_schemas import (
+    GradedTestResultSchema,
+    TestResultCreateSchema,
+    TestResultSchema,
+    TestResultSummarySchema,
+    TestSubmissionSchema,
+)
 
 
 __all__ = (
-    "AnswerCreateSchema", "AnswerSchema", "AnswerUpdateSchema",
+    "AnswerCreateSchema", "AnswerSchema", "AnswerUpdateSchema", "AnswerUpsertSchema",
+    "PresignedUploadSchema",
+    "BulkResultSchema", "BulkRowErrorSchema",
+    "AnswerImportSchema", "QuestionImportSchema", "TestImportSchema",
+    "PageSchema",
     "QuestionCreateSchema", "QuestionSchema", "QuestionUpdateSchema",
-    "TestCreateSchema", "TestSchema", "TestUpdateSchema",
-    "TestResultSchema"
+    "TestCreateSchema", "TestSchema", "TestSummarySchema", "TestUpdateSchema",
+    "TestResultSchema", "TestResultCreateSchema", "TestResultSummarySchema",
+    "TestSubmissionSchema", "GradedTestResultSchema"
 )
\ No newline at end of file
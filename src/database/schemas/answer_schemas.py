@@ -1,13 +1,12 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, computed_field, field_validator
 
 
 class AnswerBaseSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     text: Optional[str] = None
-    s3_file_path: Optional[str] = None
     points: float
     is_correct: bool
     is_required: bool
@@ -18,11 +17,38 @@ class AnswerSchema(AnswerBaseSchema):
     id: int
     created_at: datetime
     updated_at: datetime
+    s3_file_path: Optional[str] = None
+    question_id: int
+
+    @computed_field
+    @property
+    def file_url(self) -> Optional[str]:
+        """Presigned GET URL, щоб клієнт завантажував файл напряму з S3"""
+        if not self.s3_file_path:
+            return None
+        from s3_actions import S3Client
+        return S3Client.presigned_get_url(self.s3_file_path)
 
 
 class AnswerCreateSchema(AnswerBaseSchema):
-    pass
+    question_id: int
 
 
 class AnswerUpdateSchema(AnswerBaseSchema):
-    pass
\ No newline at end of file
+    points: Optional[float] = None
+    is_correct: Optional[bool] = None
+    is_required: Optional[bool] = None
+
+    @field_validator("points", "is_correct", "is_required")
+    @classmethod
+    def not_null(cls, value):
+        """Поле можна не передавати, але явний null для NOT NULL колонки — помилка валідації, а не 500"""
+        if value is None:
+            raise ValueError("may be omitted, but must not be null")
+        return value
+
+
+class AnswerUpsertSchema(AnswerBaseSchema):
+    """Елемент пакетного запису відповідей питання: без id — нова відповідь, з id — оновлення"""
+
+    id: Optional[int] = None
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class PresignedUploadSchema(BaseModel):
+
+    key: str
+    url: str
+    fields: dict[str, str]  # Поля форми, що передаються разом із файлом (multipart/form-data POST на url)
+    expires_in: int
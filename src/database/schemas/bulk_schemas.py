@@ -0,0 +1,15 @@
+from typing import Any, Dict, List
+from pydantic import BaseModel
+
+
+class BulkRowErrorSchema(BaseModel):
+    """Помилка одного рядка пакетного запиту; index — позиція в масиві або номер рядка NDJSON"""
+
+    index: int
+    errors: List[Dict[str, Any]]
+
+
+class BulkResultSchema(BaseModel):
+
+    ids: List[int]
+    errors: List[BulkRowErrorSchema]
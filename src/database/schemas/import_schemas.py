@@ -0,0 +1,20 @@
+from typing import List
+
+from database.schemas.answer_schemas import AnswerBaseSchema
+from database.schemas.question_schemas import QuestionBaseSchema
+from database.schemas.test_schemas import TestCreateSchema
+
+
+class AnswerImportSchema(AnswerBaseSchema):
+    """Файли до імпортованих питань і відповідей додаються окремо, через presigned URL"""
+
+
+class QuestionImportSchema(QuestionBaseSchema):
+
+    answers: List[AnswerImportSchema] = []
+
+
+class TestImportSchema(TestCreateSchema):
+    """Повний документ тесту: тест, його питання та відповіді"""
+
+    questions: List[QuestionImportSchema] = []
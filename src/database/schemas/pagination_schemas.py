@@ -0,0 +1,11 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+
+ItemT = TypeVar("ItemT")
+
+
+class PageSchema(BaseModel, Generic[ItemT]):
+
+    items: List[ItemT]
+    next_cursor: Optional[str] = None
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, computed_field
 
 from database.schemas.answer_schemas import AnswerSchema
 
@@ -17,12 +17,23 @@ class QuestionSchema(QuestionBaseSchema):
     id: int
     created_at: datetime
     updated_at: datetime
-    answers: List["AnswerSchema"] = None
+    s3_file_path: Optional[str] = None
+    answers: Optional[List["AnswerSchema"]] = None
     test_id: int
 
+    @computed_field
+    @property
+    def file_url(self) -> Optional[str]:
+        """Presigned GET URL, щоб клієнт завантажував файл напряму з S3"""
+        if not self.s3_file_path:
+            return None
+        from s3_actions import S3Client
+        return S3Client.presigned_get_url(self.s3_file_path)
+
 
 class QuestionCreateSchema(QuestionBaseSchema):
     test_id: int
+    s3_file_path: Optional[str] = None
 
 
 class QuestionUpdateSchema(QuestionBaseSchema):
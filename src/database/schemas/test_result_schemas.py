@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List, Optional
 from pydantic import BaseModel, ConfigDict
 
 
@@ -9,4 +10,36 @@ class TestResultSchema(BaseModel):
     username: str
     user_email: str
     grade: float
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+
+
+class TestResultCreateSchema(BaseModel):
+
+    username: str
+    user_email: str
+    grade: float
+    test_id: int
+
+
+class TestSubmissionSchema(BaseModel):
+    """Спроба проходження тесту: id усіх обраних відповідей"""
+
+    username: str
+    user_email: str
+    answer_ids: List[int]
+
+
+class GradedTestResultSchema(TestResultSchema):
+
+    max_grade: float
+
+
+class TestResultSummarySchema(BaseModel):
+    """Агрегат по всіх спробах тесту, рахується в SQL"""
+
+    attempts: int = 0
+    mean_grade: Optional[float] = None
+    median_grade: Optional[float] = None
+    p90_grade: Optional[float] = None
+    min_grade: Optional[float] = None
+    max_grade: Optional[float] = None
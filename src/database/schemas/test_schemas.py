@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, ConfigDict
 from database.schemas.question_schemas import QuestionSchema
-from database.schemas.test_result_schemas import TestResultSchema
+from database.schemas.test_result_schemas import TestResultSummarySchema
 
 
 class TestBaseSchema(BaseModel):
@@ -18,7 +18,17 @@ class TestSchema(TestBaseSchema):
     created_at: datetime
     updated_at: datetime
     questions: Optional[List["QuestionSchema"]] = None
-    results: Optional[List["TestResultSchema"]] = None
+    results_summary: Optional[TestResultSummarySchema] = None
+
+
+class TestSummarySchema(BaseModel):
+    """Легке представлення тесту для списків з fields=: id і лише запитані колонки"""
+
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 
 class TestCreateSchema(TestBaseSchema):
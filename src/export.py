@@ -0,0 +1,106 @@
+"""
+Streaming export of tests and results as NDJSON or CSV.
+
+Used by the /test/export endpoints and as a CLI:
+
+    cd src && python -m export tests --format ndjson --expand questions.answers > tests.ndjson
+    cd src && python -m export results --format csv --test-id 1 --output results.csv
+"""
+import argparse
+import asyncio
+import csv
+import io
+import sys
+from typing import AsyncIterable, AsyncIterator, Iterable
+from pydantic_core import to_json
+from database import session_factory
+from repositories.test_repository import TestRepository
+from repositories.test_result_repository import TestResultRepository
+
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Рядки збираються в шматки приблизно такого розміру, щоб не писати в сокет по рядку
+CHUNK_SIZE = 64 * 1024
+
+
+async def encode_ndjson(rows: AsyncIterable[dict]) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    async for row in rows:
+        buffer += to_json(row)
+        buffer += b"\n"
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def encode_csv(rows: AsyncIterable[dict], fieldnames: Iterable[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(fieldnames))
+    writer.writeheader()
+    async for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def export_tests(export_format: str, expand: set[str] = frozenset()) -> AsyncIterator[bytes]:
+    """
+        Сесія відкривається тут, а не береться із залежності: FastAPI закриває
+        залежності до того, як StreamingResponse дочитає генератор.
+    """
+    repo = TestRepository()
+    async with session_factory() as session:
+        rows = repo.stream_tests(session, expand)
+        if export_format == "csv":
+            chunks = encode_csv(rows, (column.key for column in repo.export_columns))
+        else:
+            chunks = encode_ndjson(rows)
+        async for chunk in chunks:
+            yield chunk
+
+
+async def export_results(export_format: str, test_id: int | None = None) -> AsyncIterator[bytes]:
+    repo = TestResultRepository()
+    async with session_factory() as session:
+        rows = repo.stream_results(session, test_id)
+        if export_format == "csv":
+            chunks = encode_csv(rows, (column.key for column in repo.export_columns))
+        else:
+            chunks = encode_ndjson(rows)
+        async for chunk in chunks:
+            yield chunk
+
+
+async def main(args) -> None:
+    if args.entity == "tests":
+        expand = {name.strip() for name in args.expand.split(",") if name.strip()} if args.expand else set()
+        chunks = export_tests(args.format, expand)
+    else:
+        chunks = export_results(args.format, args.test_id)
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entity", choices=("tests", "results"))
+    parser.add_argument("--format", choices=tuple(MEDIA_TYPES), default="ndjson")
+    parser.add_argument("--expand", help="tests only, NDJSON only: questions or questions.answers")
+    parser.add_argument("--test-id", type=int, help="results only: export one test")
+    parser.add_argument("--output", help="file to write (default: stdout)")
+    args = parser.parse_args()
+    if args.expand and (args.entity != "tests" or args.format != "ndjson"):
+        parser.error("--expand is only supported for NDJSON export of tests")
+    asyncio.run(main(args))
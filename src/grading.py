@@ -0,0 +1,140 @@
+import logging
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Iterable
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from cache import CacheBackend, LRUCacheBackend, test_cache
+from config import settings
+from database.models import Answer, Question, Test
+
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True, slots=True)
+class AnswerKey:
+    """
+        Ключ відповідей тесту, зібраний одним запитом.
+        Оцінювання спроби — O(кількості обраних відповідей), без запитів до БД.
+    """
+
+    question_of: dict[int, int]  # answer_id -> question_id
+    points: dict[int, float]  # answer_id -> бали
+    correct: frozenset[int]  # id правильних відповідей
+    required: dict[int, frozenset[int]]  # question_id -> id обов'язкових відповідей
+    max_grade: float
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> "AnswerKey":
+        question_of, points, correct, required = {}, {}, set(), {}
+        max_grade = 0.0
+        for answer_id, question_id, answer_points, is_correct, is_required in rows:
+            question_of[answer_id] = question_id
+            points[answer_id] = answer_points
+            if is_correct:
+                correct.add(answer_id)
+                max_grade += answer_points
+            if is_required:
+                required.setdefault(question_id, set()).add(answer_id)
+        return cls(
+            question_of=question_of,
+            points=points,
+            correct=frozenset(correct),
+            required={question_id: frozenset(ids) for question_id, ids in required.items()},
+            max_grade=max_grade,
+        )
+
+    def grade(self, answer_ids: Iterable[int]) -> float:
+        """
+            Питання зараховується, якщо серед обраних відповідей немає неправильних
+            і обрано всі обов'язкові; тоді воно дає суму балів обраних відповідей.
+        """
+        selected: dict[int, set[int]] = {}
+        for answer_id in answer_ids:
+            question_id = self.question_of.get(answer_id)
+            if question_id is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Answer {answer_id} does not belong to this test"
+                )
+            selected.setdefault(question_id, set()).add(answer_id)
+
+        grade = 0.0
+        for question_id, ids in selected.items():
+            if ids <= self.correct and self.required.get(question_id, frozenset()) <= ids:
+                grade += sum(self.points[answer_id] for answer_id in ids)
+        return grade
+
+
+class AnswerKeyCache:
+    """
+        Ключі відповідей у пам'яті процесу. Лічильник версій живе в бекенді
+        кешу тестів, тож зміна питання чи відповіді в одному воркері скидає ключ в усіх —
+        але лише якщо цей бекенд спільний (Redis). Лічильник у LRU процесу не бачать
+        інші воркери й інстанси, а оцінка зберігається в test_result, тож тоді ключ
+        щоразу читається з БД. Бекенди створюються при першому зверненні.
+    """
+
+    @cached_property
+    def counters(self) -> CacheBackend:
+        return test_cache.backend
+
+    @cached_property
+    def enabled(self) -> bool:
+        return not isinstance(self.counters, LRUCacheBackend)
+
+    @cached_property
+    def entries(self) -> LRUCacheBackend:
+        return LRUCacheBackend(settings.cache.cache_max_entries)
+
+    @cached_property
+    def ttl(self) -> float:
+        return settings.cache.cache_ttl
+
+    async def _key(self, test_id: int) -> str | None:
+        try:
+            version = await self.counters.get(f"answer_key:{test_id}:version")
+        except Exception:
+            logger.exception("Answer key version read failed")
+            return None
+        return f"answer_key:{test_id}:v{int(version or 0)}"
+
+    async def get(self, session: AsyncSession, test_id: int) -> AnswerKey:
+        if not self.enabled:
+            return await load_answer_key(session, test_id)
+        key = await self._key(test_id)
+        answer_key = await self.entries.get(key) if key is not None else None
+        if answer_key is None:
+            answer_key = await load_answer_key(session, test_id)
+            if key is not None:
+                await self.entries.set(key, answer_key, self.ttl)
+        return answer_key
+
+    async def invalidate(self, test_id: int) -> None:
+        if not self.enabled:
+            return
+        try:
+            await self.counters.incr(f"answer_key:{test_id}:version")
+        except Exception:
+            logger.exception("Answer key invalidation failed")
+
+
+async def load_answer_key(session: AsyncSession, test_id: int) -> AnswerKey:
+    """Всі відповіді тесту одним запитом; LEFT JOIN від тесту відрізняє порожній тест від відсутнього"""
+    rows = (await session.execute(
+        select(Answer.id, Answer.question_id, Answer.points, Answer.is_correct, Answer.is_required)
+        .select_from(Test)
+        .outerjoin(Question, Question.test_id == Test.id)
+        .outerjoin(Answer, Answer.question_id == Question.id)
+        .where(Test.id == test_id)
+    )).all()
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Test with id {test_id} not found"
+        )
+    return AnswerKey.from_rows(row for row in rows if row[0] is not None)
+
+
+answer_key_cache = AnswerKeyCache()
@@ -0,0 +1,206 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import settings
+from metrics import (
+    DB_QUERIES_PER_REQUEST,
+    DB_QUERY_BUDGET_EXCEEDED,
+    DB_QUERY_DURATION,
+    DB_QUERY_TIME_PER_REQUEST,
+    DB_REPEATED_STATEMENTS,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+)
+
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RequestStats:
+    """Лічильники поточного запиту; SQL-хуки дописують сюди через contextvar"""
+
+    queries: int = 0
+    query_time: float = 0.0
+    statements: dict[str, int] = field(default_factory=dict)  # SQL -> скільки разів виконано
+    batched: bool = False  # запит навмисно виконує той самий SQL для кожного батчу
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Однакові інструкції, виконані щонайменше threshold разів (типовий N+1), найчастіші першими"""
+        if threshold <= 0:
+            return []
+        return sorted(
+            ((statement, count) for statement, count in self.statements.items() if count >= threshold),
+            key=lambda item: -item[1],
+        )
+
+    def violations(self, budget: int | None, repeat_threshold: int) -> list[str]:
+        """budget=None — без бюджету (0 означає, що SQL не має бути взагалі)"""
+        if self.batched:
+            return []
+        problems = []
+        if budget is not None and self.queries > budget:
+            problems.append(f"{self.queries} SQL statements, budget is {budget}")
+        for statement, count in self.repeated(repeat_threshold):
+            problems.append(f"{count}x the same statement (N+1?): {' '.join(statement.split())[:300]}")
+        return problems
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """Код у track_queries виконав забагато SQL-інструкцій або повторював одну й ту саму"""
+
+
+def allow_batched_queries() -> None:
+    """
+        Для ендпоінтів, що навмисно виконують той самий запит на кожен батч
+        (масове завантаження, імпорт): бюджет і детектор N+1 їх не чіпають.
+    """
+    stats = request_stats.get()
+    if stats is not None:
+        stats.batched = True
+
+
+@contextmanager
+def track_queries(budget: int | None = None, repeat_threshold: int = 0) -> Iterator[RequestStats]:
+    """
+        Рахує SQL-інструкції коду всередині блоку (тести, бенчмарки, скрипти);
+        на виході кидає QueryBudgetExceeded, якщо бюджет перевищено чи є N+1.
+    """
+    stats = RequestStats()
+    token = request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        request_stats.reset(token)
+    problems = stats.violations(budget, repeat_threshold)
+    if problems:
+        raise QueryBudgetExceeded("; ".join(problems))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_QUERY_DURATION.observe(elapsed)
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_time += elapsed
+        # Текст SQL з плейсхолдерами однаковий для кожного lazy load / запиту в циклі
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Кількість і час SQL-запитів: загальна гістограма та підсумок на HTTP-запит"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+        ASGI-middleware: гістограма тривалості за шаблоном маршруту (не за сирим шляхом,
+        щоб не роздувати кількість серій) і кількість/час SQL-запитів на запит.
+        Перевищення SQL_QUERY_BUDGET і повтори однієї інструкції (N+1) логуються й
+        рахуються в метриках; з SQL_STRICT такий запит отримує 500 з описом порушення,
+        а якщо відповідь уже почалася (стрімінг тіла), її обриває і логує як помилку.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        app_settings = settings.app
+        budget = app_settings.sql_query_budget or None  # SQL_QUERY_BUDGET=0 вимикає бюджет
+        repeat_threshold = app_settings.sql_repeat_threshold
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status_code = 500
+        replaced = False
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code, replaced
+            if replaced:
+                return
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if app_settings.sql_strict:
+                    problems = stats.violations(budget, repeat_threshold)
+                    if problems:
+                        # Відповідь обробника підміняється: CI бачить порушення як помилку
+                        replaced = True
+                        status_code = 500
+                        body = json.dumps({"detail": "SQL query budget violated", "problems": problems}).encode()
+                        await send({
+                            "type": "http.response.start",
+                            "status": 500,
+                            "headers": [
+                                (b"content-type", b"application/json"),
+                                (b"content-length", str(len(body)).encode()),
+                                (b"x-db-queries", str(stats.queries).encode()),
+                            ],
+                        })
+                        await send({"type": "http.response.body", "body": body})
+                        return
+                    message["headers"] = [*message.get("headers", []), (b"x-db-queries", str(stats.queries).encode())]
+            elif message["type"] == "http.response.body" and app_settings.sql_strict and not message.get("more_body"):
+                problems = stats.violations(budget, repeat_threshold)
+                if problems:
+                    # Заголовки вже надіслано, а тіло стрімилося з SQL: замінити відповідь не можна,
+                    # тож не віддаємо останній фрагмент — сервер обриває з'єднання
+                    status_code = 500
+                    raise QueryBudgetExceeded("; ".join(problems))
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"],
+                route=route_path,
+                status=status_code,
+            ).observe(time.perf_counter() - start)
+            DB_QUERIES_PER_REQUEST.observe(stats.queries)
+            DB_QUERY_TIME_PER_REQUEST.observe(stats.query_time)
+            # З SQL_STRICT порушення, які не вдалося показати заміною відповіді (стрімінг тіла,
+            # завершення залежностей після відправки), — помилка, а не попередження
+            level = logging.ERROR if app_settings.sql_strict and not replaced else logging.WARNING
+            self.report_violations(scope["method"], route_path, stats, budget, repeat_threshold, level)
+            request_stats.reset(token)
+
+    @staticmethod
+    def report_violations(method: str, route: str, stats: RequestStats, budget: int | None, repeat_threshold: int,
+                          level: int = logging.WARNING) -> None:
+        if stats.batched:
+            return
+        if budget is not None and stats.queries > budget:
+            DB_QUERY_BUDGET_EXCEEDED.labels(route=route).inc()
+            logger.log(level, "%s %s executed %d SQL statements, budget is %d", method, route, stats.queries, budget)
+        repeated = stats.repeated(repeat_threshold)
+        if repeated:
+            DB_REPEATED_STATEMENTS.labels(route=route).inc()
+            for statement, count in repeated:
+                logger.log(
+                    level,
+                    "%s %s repeated a SQL statement %d times (N+1?): %s",
+                    method, route, count, " ".join(statement.split())[:300],
+                )
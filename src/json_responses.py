@@ -0,0 +1,18 @@
+from typing import Any
+from fastapi import Response
+from pydantic_core import to_json
+
+
+class SchemaJSONResponse(Response):
+    """
+        JSON-відповідь з уже провалідованих Pydantic-схем: байти будуються одним
+        викликом pydantic-core, а FastAPI не валідує та не серіалізує Response повторно.
+        response_model маршруту лишається для документації OpenAPI.
+        Готові байти (напр. з кешу) віддаються як є.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return to_json(content)
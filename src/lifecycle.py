@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import signal
+import threading
+import time
+from typing import Coroutine
+from config import settings
+from database import dispose_engine, get_engine, pool_limits
+from logging_config import configure_logging
+from metrics import mark_process_dead
+from s3_actions import S3Client
+
+
+logger = logging.getLogger(__name__)
+
+class AppResources:
+    """
+        Ресурси процесу, якими керує lifespan: прогрів пулу БД і S3 до готовності,
+        перехід у draining за SIGTERM, фонові задачі та плавна зупинка з дедлайном.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self.deadline: float | None = None  # time.monotonic(), до якого має завершитися зупинка
+        self.stop = asyncio.Event()  # сигнал фоновим задачам завершитися
+        self.tasks: set[asyncio.Task] = set()
+
+    async def startup(self) -> None:
+        configure_logging()
+        await asyncio.gather(self.warm_db_pool(), S3Client.warm_up())
+        self.install_signal_handler()
+        self.ready = True
+        logger.info("Application is ready")
+
+    def install_signal_handler(self) -> None:
+        """
+            uvicorn закриває сокети одразу після SIGTERM, а lifespan shutdown запускає лише
+            після того, як обслужить відкриті з'єднання — тоді /readyz уже нікому відповідати.
+            Тому SIGTERM перехоплюється: /readyz одразу віддає 503, а uvicorn отримує сигнал
+            через shutdown_readiness_delay, коли балансувальник уже прибрав інстанс з ротації.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        server_handler = signal.getsignal(signal.SIGTERM)
+        if not callable(server_handler):
+            return  # сервер без власного обробника (напр. тести) — нічого відкладати
+        loop = asyncio.get_running_loop()
+
+        def handle_sigterm(sig, frame) -> None:
+            if self.draining:
+                server_handler(sig, frame)  # повторний SIGTERM — зупинка без очікування
+                return
+            self.begin_draining(delay=settings.app.shutdown_readiness_delay)
+            logger.info("SIGTERM received, not ready; stopping the server in %ss", settings.app.shutdown_readiness_delay)
+            loop.call_soon_threadsafe(loop.call_later, settings.app.shutdown_readiness_delay, server_handler, sig, frame)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+    def begin_draining(self, delay: float = 0.0) -> None:
+        """
+            Єдиний бюджет зупинки: delay на вихід з ротації, далі shutdown_drain_timeout
+            разом на запити в роботі (їх чекає uvicorn) і фонові задачі (lifespan).
+        """
+        if self.draining:
+            return
+        self.ready = False
+        self.draining = True
+        self.deadline = time.monotonic() + delay + settings.app.shutdown_drain_timeout
+
+    async def warm_db_pool(self) -> None:
+        """
+            Відкриває N з'єднань одночасно (інакше пул повертав би те саме з'єднання)
+            і повертає їх у пул: перші запити не чекають на підключення до БД.
+        """
+        engine = get_engine()
+        pool_size, max_overflow = pool_limits()
+        count = min(settings.db.db_pool_warm_connections or pool_size, pool_size + max_overflow)
+        connections = [engine.connect() for _ in range(count)]
+        try:
+            await asyncio.gather(*(connection.start() for connection in connections))
+        finally:
+            await asyncio.gather(*(connection.close() for connection in connections))
+
+    def spawn(self, coro: Coroutine) -> asyncio.Task:
+        """Фонова задача, яку зупинка дочекається (до дедлайну) перед закриттям пулу"""
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def shutdown(self) -> None:
+        """
+            Запити в роботі вже дочекався uvicorn; тут фонові задачі завершуються в межах
+            решти бюджету зупинки, лише після цього закриваються пул і S3.
+        """
+        self.begin_draining()
+        self.stop.set()
+        if self.tasks:
+            _, pending = await asyncio.wait(self.tasks, timeout=max(0.0, self.deadline - time.monotonic()))
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning("Cancelled %d background tasks at the shutdown deadline", len(pending))
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        await dispose_engine()
+        S3Client.shutdown()
+        mark_process_dead()
+        logger.info("Application stopped")
+
+
+resources = AppResources()
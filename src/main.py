@@ -1,12 +1,33 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from instrumentation import MetricsMiddleware
+from lifecycle import resources
 from routers.test_router import router as test_router
 from routers.question_router import router as question_router
+from routers.answer_router import router as answer_router
+from routers.health_router import router as health_router
+from routers.metrics_router import router as metrics_router
+from s3_outbox import run_s3_deletion_worker
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Налаштування, engine і S3-клієнт створюються тут, а не під час імпорту модулів
+    await resources.startup()
+    resources.spawn(run_s3_deletion_worker(resources.stop))
+    yield
+    await resources.shutdown()
+
 
 app = FastAPI(
-    title="Test API"
+    title="Test API",
+    lifespan=lifespan,
 )
 
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(test_router)
 app.include_router(question_router)
+app.include_router(answer_router)
+app.include_router(health_router)
+app.include_router(metrics_router)
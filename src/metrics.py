@@ -0,0 +1,122 @@
+import os
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+
+# server.py з кількома воркерами задає PROMETHEUS_MULTIPROC_DIR: кожен процес пише значення
+# у файли цього каталогу, а /metrics будь-якого воркера зводить їх разом. Для gauge режим
+# зведення задає multiprocess_mode (поза цим режимом він ні на що не впливає)
+MULTIPROCESS_DIR_VARIABLE = "PROMETHEUS_MULTIPROC_DIR"
+
+
+S3_OUTBOX_DEPTH = Gauge(
+    "s3_deletion_outbox_depth",
+    "S3 keys waiting in the deletion outbox",
+    multiprocess_mode="livemostrecent",
+)
+S3_OUTBOX_DELETED = Counter(
+    "s3_deletion_outbox_deleted_total",
+    "S3 keys deleted by the outbox worker",
+)
+S3_OUTBOX_FAILED = Counter(
+    "s3_deletion_outbox_failed_total",
+    "Failed S3 key deletions (each one is retried later)",
+)
+TEST_CACHE_HITS = Counter(
+    "test_cache_hits_total",
+    "Test payloads served from the cache",
+)
+TEST_CACHE_MISSES = Counter(
+    "test_cache_misses_total",
+    "Test payloads built from the database",
+)
+TEST_CACHE_INVALIDATIONS = Counter(
+    "test_cache_invalidations_total",
+    "Test cache invalidations after writes",
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured number of persistent database connections",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Database connections currently in use",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_IN = Gauge(
+    "db_pool_checked_in",
+    "Idle database connections in the pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections opened above pool_size (negative while the pool is not full yet)",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTS = Counter(
+    "db_pool_connects_total",
+    "New database connections opened (reconnect rate)",
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total",
+    "Connections handed out by the pool",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the pool, including opening a new one",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duration of a single SQL statement",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 10),
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while handling one HTTP request",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144),
+)
+DB_QUERY_TIME_PER_REQUEST = Histogram(
+    "db_query_time_per_request_seconds",
+    "Total SQL time while handling one HTTP request",
+)
+DB_QUERY_BUDGET_EXCEEDED = Counter(
+    "db_query_budget_exceeded_total",
+    "HTTP requests that executed more SQL statements than SQL_QUERY_BUDGET",
+    ["route"],
+)
+DB_REPEATED_STATEMENTS = Counter(
+    "db_repeated_statements_total",
+    "HTTP requests that repeated one SQL statement SQL_REPEAT_THRESHOLD+ times (likely N+1)",
+    ["route"],
+)
+S3_CALL_DURATION = Histogram(
+    "s3_call_duration_seconds",
+    "Duration of S3 API calls by operation",
+    ["operation"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum",
+)
+
+
+def latest() -> bytes:
+    """Текст для /metrics: у multiprocess-режимі — сума по всіх воркерах, інакше — цей процес"""
+    if os.environ.get(MULTIPROCESS_DIR_VARIABLE):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+
+def mark_process_dead() -> None:
+    """Прибирає live-gauge процесу, що зупиняється, щоб його пул і запити не рахувались далі"""
+    if os.environ.get(MULTIPROCESS_DIR_VARIABLE):
+        multiprocess.mark_process_dead(os.getpid())
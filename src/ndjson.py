@@ -0,0 +1,52 @@
+from typing import Any, AsyncIterable, AsyncIterator
+from fastapi import HTTPException, Request, status
+from pydantic_core import from_json
+
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    """
+        Розбиває потік байтів на рядки, не читаючи тіло повністю. Номер (з нуля) —
+        це номер фізичного рядка: порожні рядки пропускаються вже після нумерації.
+    """
+    number = 0
+    tail = b""
+    async for chunk in chunks:
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield number, line
+            number += 1
+    if tail.strip():
+        yield number, tail
+
+
+async def iter_rows(request: Request, allow_object: bool = False) -> AsyncIterator[tuple[int, Any]]:
+    """
+        Рядки тіла запиту з їх номерами: NDJSON читається потоково (кожен рядок — bytes,
+        розбирається під час валідації, номер — рядок вхідних даних з нуля),
+        JSON-масив — цілком (елементи — python-об'єкти, номер — індекс у масиві).
+        allow_object дозволяє передати один JSON-об'єкт замість масиву.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_MEDIA_TYPES:
+        async for item in iter_lines(request.stream()):
+            yield item
+        return
+
+    try:
+        rows = from_json(await request.body())
+    except ValueError:
+        rows = None
+    if allow_object and isinstance(rows, dict):
+        rows = [rows]
+    if not isinstance(rows, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Expected a JSON {'object, ' if allow_object else ''}array or NDJSON body"
+        )
+    for index, row in enumerate(rows):
+        yield index, row
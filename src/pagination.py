@@ -0,0 +1,24 @@
+import base64
+import json
+from fastapi import HTTPException, status
+
+
+def encode_cursor(**position) -> str:
+    """Непрозорий курсор для keyset-пагінації (позиція останнього елемента сторінки)"""
+    return base64.urlsafe_b64encode(json.dumps(position, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str, **fields: type) -> dict:
+    """Розбирає курсор і перевіряє, що кожне поле з fields має очікуваний тип"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        position = None
+    if not isinstance(position, dict) or any(
+        not isinstance(position.get(name), field_type) for name, field_type in fields.items()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return position
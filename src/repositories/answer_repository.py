@@ -0,0 +1,126 @@
+from typing import Annotated
+from fastapi import Depends
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from custom_exceptions import ActionEnum, AnswerEntityException, AnswerCreateException, AnswerDeleteException, AnswerUpdateException
+from database.models import Answer, Question
+from database.schemas import AnswerSchema, AnswerUpsertSchema
+from repositories.base_repository import BaseRepository
+from s3_outbox import enqueue_s3_deletion, enqueue_s3_deletion_from
+
+
+class AnswerRepository(BaseRepository[Answer, AnswerSchema, AnswerEntityException]):
+    model = Answer
+    exceptions = {
+        ActionEnum.CREATE: AnswerCreateException,
+        ActionEnum.UPDATE: AnswerUpdateException,
+        ActionEnum.DELETE: AnswerDeleteException,
+    }
+
+    async def affected_test_id(self, session, obj):
+        return await session.scalar(select(Question.test_id).where(Question.id == obj.question_id))
+
+    async def before_delete(self, session, object_id):
+        """Ставимо S3-файл відповіді в чергу на видалення (в тій самій транзакції)"""
+        await enqueue_s3_deletion_from(
+            session,
+            select(Answer.s3_file_path)
+            .where(Answer.id == object_id, Answer.s3_file_path.is_not(None)),
+        )
+
+    async def update_file_path(
+        self,
+        session: AsyncSession,
+        answer_id: int,
+        new_s3_file_path: str,
+    ) -> AnswerSchema:
+        try:
+            answer = await session.get(Answer, answer_id)
+            if not answer:
+                raise AnswerUpdateException(f"Answer with id {answer_id} not found")
+
+            if new_s3_file_path != answer.s3_file_path:
+                # Повторне підтвердження того самого ключа не повинно видалити файл
+                enqueue_s3_deletion(session, [answer.s3_file_path])
+            answer.s3_file_path = new_s3_file_path
+            await session.commit()
+            await self.invalidate_cache(session, answer)
+            await session.refresh(answer)
+            return answer.to_pydantic()
+        except Exception as e:
+            await session.rollback()
+            exc_cls = self.exceptions.get(ActionEnum.UPDATE, AnswerEntityException)
+            raise exc_cls(str(e))
+
+    async def upsert_answers(
+        self,
+        session: AsyncSession,
+        question_id: int,
+        answers: list[AnswerUpsertSchema],
+        delete_missing: bool = True,
+    ) -> list[AnswerSchema]:
+        """
+            Записує набір відповідей питання як diff у одній транзакції:
+            нові вставляються одним INSERT, змінені оновлюються одним executemany,
+            відсутні в наборі (якщо delete_missing) видаляються одним DELETE.
+            Незмінені відповіді не чіпаються; зв'язки питання не перезавантажуються.
+        """
+        try:
+            # Блокування питання серіалізує паралельні пакетні записи його відповідей
+            test_id = await session.scalar(
+                select(Question.test_id).where(Question.id == question_id).with_for_update()
+            )
+            if test_id is None:
+                raise AnswerUpdateException(f"Question with id {question_id} not found")
+
+            current = {
+                answer.id: answer
+                for answer in await session.scalars(select(Answer).where(Answer.question_id == question_id))
+            }
+            fields = AnswerUpsertSchema.model_fields.keys() - {"id"}
+
+            new_rows, changed_rows, seen = [], [], set()
+            for item in answers:
+                if item.id is None:
+                    new_rows.append(item.model_dump(include=fields) | {"question_id": question_id})
+                    continue
+                if item.id not in current or item.id in seen:
+                    raise AnswerUpdateException(
+                        f"Answer with id {item.id} is not an answer of question {question_id} or is repeated"
+                    )
+                seen.add(item.id)
+                answer = current[item.id]
+                values = item.model_dump(include=fields)
+                if any(getattr(answer, key) != value for key, value in values.items()):
+                    changed_rows.append(values | {"id": item.id})
+
+            missing = [answer for answer_id, answer in current.items() if answer_id not in seen] if delete_missing else []
+            if missing:
+                enqueue_s3_deletion(session, [answer.s3_file_path for answer in missing])
+                await session.execute(
+                    delete(Answer).where(Answer.id.in_([answer.id for answer in missing]))
+                )
+            if changed_rows:
+                await session.execute(update(Answer), changed_rows)
+            if new_rows:
+                await session.execute(insert(Answer), new_rows)
+
+            result = await session.scalars(
+                select(Answer)
+                .where(Answer.question_id == question_id)
+                .order_by(Answer.id)
+                .execution_options(populate_existing=True)
+            )
+            schemas = [answer.to_pydantic() for answer in result]
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            exc_cls = self.exceptions.get(ActionEnum.UPDATE, AnswerEntityException)
+            raise exc_cls(str(e))
+
+        if missing or changed_rows or new_rows:
+            await self.invalidate_test(test_id)
+        return schemas
+
+
+AnswerRepositoryDep = Annotated[AnswerRepository, Depends(AnswerRepository)]
@@ -1,7 +1,9 @@
 from typing import TypeVar, Generic, Type
-from sqlalchemy import inspect as inspect
+from sqlalchemy import delete, inspect as inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
+from cache import test_cache
+from grading import answer_key_cache
 from custom_exceptions import ActionEnum, EntityException, Exc
 from database.models import Base
 from sqlalchemy.orm import selectinload
@@ -16,12 +18,31 @@ class BaseRepository(Generic[T, S, Exc]):
 
     @property
     def relationships(self):
-        return [rel.key for rel in inspect(self.model).relationships]
-
-    async def before_delete(self, obj: Type[T]):
-        """Метод, який можна перевизначати нащадках, якщо потрібно виконати дії перед видаленням"""
+        """Зв'язки, які віддаються у схемі моделі (інші не завантажуємо)"""
+        schema_fields = self.model.Schema.model_fields
+        return [rel.key for rel in inspect(self.model).relationships if rel.key in schema_fields]
+
+    async def before_delete(self, session: AsyncSession, object_id: int):
+        """
+            Метод, який можна перевизначати нащадках, якщо потрібно виконати дії перед видаленням.
+            Об'єкт не завантажується: дочірні рядки видаляє ON DELETE CASCADE.
+        """
         pass
 
+    async def affected_test_id(self, session: AsyncSession, obj: T) -> int | None:
+        """id тесту, закешоване представлення якого змінюється разом з obj (перевизначається нащадками)"""
+        return None
+
+    async def invalidate_cache(self, session: AsyncSession, obj: T) -> None:
+        """Скидає кеш тесту після коміту зміни obj"""
+        await self.invalidate_test(await self.affected_test_id(session, obj))
+
+    async def invalidate_test(self, test_id: int | None) -> None:
+        """Зміна тесту, питання чи відповіді: скидаються закешований тест і ключ відповідей"""
+        if test_id is not None:
+            await test_cache.invalidate(test_id)
+            await answer_key_cache.invalidate(test_id)
+
     async def create(
         self,
         session: AsyncSession,
@@ -31,6 +52,7 @@ class BaseRepository(Generic[T, S, Exc]):
             new_object = self.model(**schema.model_dump(exclude_unset=True))
             session.add(new_object)
             await session.commit()
+            await self.invalidate_cache(session, new_object)
             await session.refresh(new_object, attribute_names=self.relationships)
             return new_object.to_pydantic()
         except Exception as e:
@@ -46,15 +68,20 @@ class BaseRepository(Generic[T, S, Exc]):
         try:
             exc_cls = self.exceptions.get(ActionEnum.DELETE, EntityException)
 
-            obj_to_delete = await session.get(self.model, object_id)
+            await self.before_delete(session, object_id)
 
-            if not obj_to_delete:
-                raise exc_cls(f"{self.model.__name__} with id {object_id} not found")
+            deleted_obj = await session.scalar(
+                delete(self.model)
+                .where(self.model.id == object_id)
+                .returning(self.model)
+                .execution_options(synchronize_session=False)
+            )
 
-            await self.before_delete(obj_to_delete)
+            if deleted_obj is None:
+                raise exc_cls(f"{self.model.__name__} with id {object_id} not found")
 
-            await session.delete(obj_to_delete)
             await session.commit()
+            await self.invalidate_cache(session, deleted_obj)
             return object_id
         except Exception as e:
             await session.rollback()
@@ -80,6 +107,7 @@ class BaseRepository(Generic[T, S, Exc]):
                 setattr(obj, key, value)
 
             await session.commit()
+            await self.invalidate_cache(session, obj)
             await session.refresh(obj)
             return obj.to_pydantic()
         except Exception as e:
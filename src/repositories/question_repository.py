@@ -1,12 +1,13 @@
 from typing import Annotated
 from fastapi import Depends
+from sqlalchemy import select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from custom_exceptions import ActionEnum, QuestionEntityException, QuestionCreateException, QuestionDeleteException, QuestionUpdateException
-from database.models import Question
+from database.models import Answer, Question
 from database.schemas import QuestionSchema
 from repositories.base_repository import BaseRepository
-from s3_actions import S3Client
+from s3_outbox import enqueue_s3_deletion, enqueue_s3_deletion_from
 
 
 class QuestionRepository(BaseRepository[Question, QuestionSchema, QuestionEntityException]):
@@ -17,11 +18,20 @@ class QuestionRepository(BaseRepository[Question, QuestionSchema, QuestionEntity
         ActionEnum.DELETE: QuestionDeleteException,
     }
     
-    async def before_delete(self, obj):
-        """Видаляємо S3-файл перед видаленням питання"""
-        if hasattr(obj, "s3_file_path") and obj.s3_file_path:
-            from s3_actions import S3Client
-            await S3Client.delete_file(key=obj.s3_file_path)
+    async def affected_test_id(self, session, obj):
+        return obj.test_id
+
+    async def before_delete(self, session, object_id):
+        """Ставимо S3-файли питання та його відповідей у чергу на видалення (в тій самій транзакції)"""
+        await enqueue_s3_deletion_from(
+            session,
+            union_all(
+                select(Question.s3_file_path)
+                .where(Question.id == object_id, Question.s3_file_path.is_not(None)),
+                select(Answer.s3_file_path)
+                .where(Answer.question_id == object_id, Answer.s3_file_path.is_not(None)),
+            ),
+        )
 
     async def update_question(
         self,
@@ -35,8 +45,9 @@ class QuestionRepository(BaseRepository[Question, QuestionSchema, QuestionEntity
             if not question:
                 raise QuestionUpdateException(f"Question with id {question_id_to_update} not found")
 
-            if question.s3_file_path:
-                await S3Client.delete_file(key=question.s3_file_path)
+            if new_s3_file_path and new_s3_file_path != question.s3_file_path:
+                # Повторне підтвердження того самого ключа не повинно видалити файл
+                enqueue_s3_deletion(session, [question.s3_file_path])
 
             update_data = question_update.model_dump(exclude_unset=True)
             if new_s3_file_path:
@@ -1,11 +1,18 @@
-from typing import Annotated
-from fastapi import Depends
-from sqlalchemy import select
+import hashlib
+from typing import Annotated, Any, AsyncIterable, AsyncIterator
+from fastapi import Depends, HTTPException
+from pydantic import ValidationError
+from pydantic_core import to_json
+from sqlalchemy import extract, func, insert, select, true, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from database.models import Question, Test
-from database.schemas import TestSchema
+from database.models import Answer, Question, Test, TestResult
+from database.schemas import BulkResultSchema, BulkRowErrorSchema, TestImportSchema, TestSchema, TestSummarySchema
+from cache import test_cache
+from instrumentation import allow_batched_queries
 from repositories.base_repository import BaseRepository
+from repositories.test_result_repository import TestResultRepository
+from s3_outbox import enqueue_s3_deletion_from
 from custom_exceptions import (
     TestEntityException,
     TestCreateException,
@@ -25,32 +32,279 @@ class TestRepository(BaseRepository[Test, TestSchema, TestEntityException]):
         ActionEnum.GET: TestGetException,
     }
 
+    async def affected_test_id(self, session, obj):
+        return obj.id
+
+    async def before_delete(self, session, object_id):
+        """
+            Ставимо S3-файли всіх питань і відповідей тесту в чергу одним INSERT ... SELECT.
+            Самі питання, відповіді та результати видаляє ON DELETE CASCADE.
+        """
+        await enqueue_s3_deletion_from(
+            session,
+            union_all(
+                select(Question.s3_file_path)
+                .where(Question.test_id == object_id, Question.s3_file_path.is_not(None)),
+                select(Answer.s3_file_path)
+                .join(Question, Answer.question_id == Question.id)
+                .where(Question.test_id == object_id, Answer.s3_file_path.is_not(None)),
+            ),
+        )
+
+    # Зв'язки, які клієнт може запросити через expand=, та їх завантажувачі
+    expansions = {
+        "questions": lambda: selectinload(Test.questions),
+        "questions.answers": lambda: selectinload(Test.questions).selectinload(Question.answers),
+        "results_summary": None,  # агрегат з test_result, рахується окремим GROUP BY
+    }
+
+    # Колонки, які клієнт може вибрати через fields= (id повертається завжди)
+    summary_fields = {name: getattr(Test, name) for name in TestSummarySchema.model_fields if name != "id"}
+
+    async def import_tests(
+        self,
+        session: AsyncSession,
+        documents: AsyncIterable[tuple[int, Any]],
+        batch_size: int = 100,
+    ) -> BulkResultSchema:
+        """
+            Імпорт повних документів тестів в одній транзакції. Пачка документів
+            записується трьома багаторядковими INSERT ... RETURNING (тести, питання,
+            відповіді) замість окремого запиту й коміту на кожне питання.
+            Невалідні документи пропускаються і повертаються в errors з індексом.
+        """
+        ids: list[int] = []
+        errors: list[BulkRowErrorSchema] = []
+        batch: list[TestImportSchema] = []
+        allow_batched_queries()  # по запиту на кожен батч — очікувано, не N+1
+        try:
+            async for index, raw in documents:
+                try:
+                    if isinstance(raw, bytes):
+                        document = TestImportSchema.model_validate_json(raw)
+                    else:
+                        document = TestImportSchema.model_validate(raw)
+                except ValidationError as e:
+                    errors.append(BulkRowErrorSchema(
+                        index=index,
+                        errors=e.errors(include_url=False, include_context=False, include_input=False),
+                    ))
+                    continue
+                batch.append(document)
+                if len(batch) >= batch_size:
+                    ids.extend(await self._insert_documents(session, batch))
+                    batch = []
+            if batch:
+                ids.extend(await self._insert_documents(session, batch))
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            if isinstance(e, HTTPException):
+                raise
+            exc_cls = self.exceptions.get(ActionEnum.CREATE, TestEntityException)
+            raise exc_cls(str(e))
+        # Як і create: після коміту скидаємо кеш кожного вставленого тесту
+        for test_id in ids:
+            await self.invalidate_test(test_id)
+        return BulkResultSchema(ids=ids, errors=errors)
+
+    async def _insert_documents(self, session: AsyncSession, documents: list[TestImportSchema]) -> list[int]:
+        """id вставлених рядків повертаються в порядку параметрів, тож дочірні рядки зв'язуються за позицією"""
+        test_ids = list(await session.scalars(
+            insert(Test).returning(Test.id, sort_by_parameter_order=True),
+            [document.model_dump(exclude={"questions"}) for document in documents],
+        ))
+
+        questions = [
+            (test_id, question)
+            for test_id, document in zip(test_ids, documents)
+            for question in document.questions
+        ]
+        if not questions:
+            return test_ids
+        question_ids = await session.scalars(
+            insert(Question).returning(Question.id, sort_by_parameter_order=True),
+            [question.model_dump(exclude={"answers"}) | {"test_id": test_id} for test_id, question in questions],
+        )
+
+        answers = [
+            answer.model_dump() | {"question_id": question_id}
+            for question_id, (_, question) in zip(question_ids, questions)
+            for answer in question.answers
+        ]
+        if answers:
+            await session.execute(insert(Answer), answers)
+        return test_ids
+
+    # Колонки плаского експорту (CSV і NDJSON без expand)
+    export_columns = (Test.id, Test.title, Test.description, Test.created_at, Test.updated_at)
+
+    async def stream_tests(
+        self,
+        session: AsyncSession,
+        expand: set[str] = frozenset(),
+        batch_size: int = 1000,
+    ) -> AsyncIterator[dict]:
+        """
+            Потоковий експорт через серверний курсор (yield_per): у пам'яті одночасно
+            лише одна пачка рядків. З expand зв'язки довантажуються selectinload для кожної пачки.
+        """
+        if expand:
+            allow_batched_queries()  # selectinload на кожну пачку — очікувано, не N+1
+            tests = await session.stream_scalars(
+                self._tests_query(expand).execution_options(yield_per=batch_size)
+            )
+            async for test in tests:
+                yield test.to_pydantic().model_dump()
+            return
+
+        rows = await session.stream(
+            select(*self.export_columns).order_by(Test.id).execution_options(yield_per=batch_size)
+        )
+        async for row in rows.mappings():
+            yield dict(row)
+
+    def _tests_query(self, expand: set[str]):
+        """Без expand — один вузький запит лише по таблиці test"""
+        return (
+            select(Test)
+            .options(*(self.expansions[name]() for name in expand if self.expansions[name]))
+            .order_by(Test.id)
+        )
+
+    def _summary_query(self, fields: set[str]):
+        """fields= — запит лише по вибраних колонках test: без ORM-об'єктів, зв'язків і зайвих колонок"""
+        return select(Test.id, *(self.summary_fields[name] for name in sorted(fields))).order_by(Test.id)
+
+    async def _to_schemas(
+        self,
+        session: AsyncSession,
+        tests: list[Test],
+        expand: set[str],
+    ) -> list[TestSchema]:
+        schemas = [test.to_pydantic() for test in tests]
+        if "results_summary" in expand:
+            summaries = await TestResultRepository().get_summaries(session, [test.id for test in tests])
+            for schema in schemas:
+                schema.results_summary = summaries[schema.id]
+        return schemas
+
     async def get_tests(
         self,
         session: AsyncSession,
         skip: int = 0,
         limit: int = 10,
         test_id: int | None = None,
-    ) -> list[TestSchema]:
+        expand: set[str] = frozenset(),
+        fields: set[str] = frozenset(),
+    ) -> list[TestSchema] | list[dict]:
+        """З fields повертаються лише id і ці колонки (dict на тест), expand тоді не застосовується"""
         try:
-            stmt = (
-                select(Test)
-                .options(
-                    selectinload(Test.questions).selectinload(Question.answers),
-                    selectinload(Test.results),
-                )
-                .offset(skip)
-                .limit(limit)
-                .order_by(Test.id)
-            )
+            query = self._summary_query(fields) if fields else self._tests_query(expand)
+            stmt = query.offset(skip).limit(limit)
 
             if test_id is not None:
-                stmt = stmt.filter_by(id=test_id)
+                stmt = stmt.where(Test.id == test_id)
 
             result = await session.execute(stmt)
+            if fields:
+                return [dict(row) for row in result.mappings()]
             tests = result.scalars().all()
                     
-            return [test.to_pydantic() for test in tests]
+            return await self._to_schemas(session, tests, expand)
+        except Exception as e:
+            exc_cls = self.exceptions.get(ActionEnum.GET, TestEntityException)
+            raise exc_cls(str(e))
+
+    async def get_test_version(
+        self,
+        session: AsyncSession,
+        test_id: int,
+        expand: set[str] = frozenset(),
+    ) -> str | None:
+        """
+            Версія представлення GET /test/?test_id= з БД одним запитом, без завантаження дерева:
+            updated_at тесту, а для expand — кількість і сума updated_at його питань і відповідей
+            (зміна, видалення чи вставка будь-якого рядка змінює суму або кількість) і кількість
+            та останній id результатів. Presigned URL до версії не входять: їх кожен воркер
+            підписує сам. None — тесту немає.
+        """
+        stmt = select(Test.updated_at).where(Test.id == test_id)
+        aggregates = []
+        if expand & {"questions", "questions.answers"}:
+            aggregates.append(
+                select(func.count(Question.id), func.sum(extract("epoch", Question.updated_at)))
+                .where(Question.test_id == test_id)
+            )
+        if "questions.answers" in expand:
+            aggregates.append(
+                select(func.count(Answer.id), func.sum(extract("epoch", Answer.updated_at)))
+                .join(Question, Answer.question_id == Question.id)
+                .where(Question.test_id == test_id)
+            )
+        if "results_summary" in expand:
+            aggregates.append(
+                select(func.count(TestResult.id), func.max(TestResult.id)).where(TestResult.test_id == test_id)
+            )
+        for aggregate in aggregates:
+            # Агрегат без GROUP BY завжди дає один рядок, тож з'єднання не множить рядок тесту
+            subquery = aggregate.subquery()
+            stmt = stmt.join_from(Test, subquery, true()).add_columns(*subquery.c)
+
+        row = (await session.execute(stmt)).first()
+        if row is None:
+            return None
+        fingerprint = f"{test_id}:{','.join(sorted(expand))}:{':'.join(map(str, row))}"
+        return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+    async def get_test_payload(
+        self,
+        session: AsyncSession,
+        test_id: int,
+        expand: set[str],
+        version: str,
+    ) -> bytes:
+        """
+            JSON-відповідь GET /test/?test_id= через read-through кеш, ключ якого містить
+            версію з get_test_version: при попаданні дерево не завантажується і не серіалізується.
+        """
+        key, payload = await test_cache.get(test_id, expand, version)
+        if payload is None:
+            payload = to_json(await self.get_tests(session, 0, 1, test_id, expand))
+            await test_cache.set(key, payload)
+        return payload
+
+    async def get_tests_page(
+        self,
+        session: AsyncSession,
+        after_id: int | None = None,
+        limit: int = 10,
+        expand: set[str] = frozenset(),
+        fields: set[str] = frozenset(),
+    ) -> tuple[list[TestSchema] | list[dict], int | None]:
+        """
+            Keyset-пагінація по Test.id: WHERE id > after_id замість OFFSET,
+            тож глибокі сторінки коштують стільки ж, скільки перша.
+            Повертає тести та id, з якого починається наступна сторінка (або None).
+        """
+        try:
+            query = self._summary_query(fields) if fields else self._tests_query(expand)
+            stmt = query.limit(limit + 1)
+            if after_id is not None:
+                stmt = stmt.where(Test.id > after_id)
+
+            result = await session.execute(stmt)
+            if fields:
+                rows = [dict(row) for row in result.mappings()]
+                has_more = len(rows) > limit
+                rows = rows[:limit]
+                return rows, rows[-1]["id"] if has_more else None
+            tests = result.scalars().all()
+
+            has_more = len(tests) > limit
+            tests = tests[:limit]
+            next_after_id = tests[-1].id if has_more else None
+            return await self._to_schemas(session, tests, expand), next_after_id
         except Exception as e:
             exc_cls = self.exceptions.get(ActionEnum.GET, TestEntityException)
             raise exc_cls(str(e))
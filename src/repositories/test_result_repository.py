@@ -0,0 +1,231 @@
+from datetime import datetime
+from typing import Annotated, Any, AsyncIterable, AsyncIterator
+from fastapi import Depends, HTTPException
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from custom_exceptions import ActionEnum, TestResultEntityException, TestResultCreateException, TestResultGetException
+from cache import test_cache
+from database.models import Test, TestResult
+from database.schemas import (
+    BulkResultSchema,
+    BulkRowErrorSchema,
+    GradedTestResultSchema,
+    TestResultCreateSchema,
+    TestResultSchema,
+    TestResultSummarySchema,
+    TestSubmissionSchema,
+)
+from grading import answer_key_cache
+from instrumentation import allow_batched_queries
+from repositories.base_repository import BaseRepository
+
+
+class TestResultRepository(BaseRepository[TestResult, TestResultSchema, TestResultEntityException]):
+    model = TestResult
+    exceptions = {
+        ActionEnum.CREATE: TestResultCreateException,
+        ActionEnum.GET: TestResultGetException,
+    }
+
+    async def submit(
+        self,
+        session: AsyncSession,
+        test_id: int,
+        submission: TestSubmissionSchema,
+    ) -> GradedTestResultSchema:
+        """Оцінює спробу за закешованим ключем відповідей і зберігає TestResult"""
+        answer_key = await answer_key_cache.get(session, test_id)
+        result = await self.create(session, TestResultCreateSchema(
+            username=submission.username,
+            user_email=submission.user_email,
+            grade=answer_key.grade(submission.answer_ids),
+            test_id=test_id,
+        ))
+        return GradedTestResultSchema(**result.model_dump(), max_grade=answer_key.max_grade)
+
+    async def affected_test_id(self, session, obj):
+        """Нова спроба змінює results_summary тесту"""
+        return obj.test_id
+
+    async def invalidate_test(self, test_id: int | None) -> None:
+        """Спроби не змінюють ні тіло тесту, ні ключ відповідей — скидається лише results_summary"""
+        if test_id is not None:
+            await test_cache.invalidate_results(test_id)
+
+    async def bulk_create(
+        self,
+        session: AsyncSession,
+        rows: AsyncIterable[tuple[int, Any]],
+        batch_size: int = 1000,
+    ) -> BulkResultSchema:
+        """
+            Пакетний запис результатів в одній транзакції: рядки валідуються по одному
+            (помилки повертаються з індексом рядка), валідні вставляються пачками
+            багаторядковим INSERT ... RETURNING id.
+        """
+        ids: list[int] = []
+        errors: list[BulkRowErrorSchema] = []
+        test_ids: set[int] = set()
+        batch: list[tuple[int, TestResultCreateSchema]] = []
+        allow_batched_queries()  # по запиту на кожен батч — очікувано, не N+1
+        try:
+            async for index, raw in rows:
+                try:
+                    if isinstance(raw, bytes):
+                        row = TestResultCreateSchema.model_validate_json(raw)
+                    else:
+                        row = TestResultCreateSchema.model_validate(raw)
+                except ValidationError as e:
+                    errors.append(BulkRowErrorSchema(
+                        index=index,
+                        errors=e.errors(include_url=False, include_context=False, include_input=False),
+                    ))
+                    continue
+                batch.append((index, row))
+                if len(batch) >= batch_size:
+                    await self._insert_batch(session, batch, ids, errors, test_ids)
+                    batch = []
+            if batch:
+                await self._insert_batch(session, batch, ids, errors, test_ids)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            if isinstance(e, HTTPException):
+                raise
+            exc_cls = self.exceptions.get(ActionEnum.CREATE, TestResultEntityException)
+            raise exc_cls(str(e))
+
+        for test_id in test_ids:
+            await self.invalidate_test(test_id)
+        errors.sort(key=lambda error: error.index)
+        return BulkResultSchema(ids=ids, errors=errors)
+
+    async def _insert_batch(
+        self,
+        session: AsyncSession,
+        batch: list[tuple[int, TestResultCreateSchema]],
+        ids: list[int],
+        errors: list[BulkRowErrorSchema],
+        test_ids: set[int],
+    ) -> None:
+        """
+            Перевіряє існування тестів одним запитом (FOR KEY SHARE не дає їх видалити
+            до коміту) і вставляє пачку; рядки з неіснуючим test_id стають помилками.
+        """
+        existing = set(await session.scalars(
+            select(Test.id)
+            .where(Test.id.in_({row.test_id for _, row in batch}))
+            .with_for_update(key_share=True)
+        ))
+        values = []
+        for index, row in batch:
+            if row.test_id in existing:
+                values.append(row.model_dump())
+            else:
+                errors.append(BulkRowErrorSchema(index=index, errors=[{
+                    "type": "not_found",
+                    "loc": ("test_id",),
+                    "msg": f"Test with id {row.test_id} not found",
+                }]))
+        if not values:
+            return
+        ids.extend(await session.scalars(
+            insert(TestResult).returning(TestResult.id, sort_by_parameter_order=True),
+            values,
+        ))
+        test_ids.update(row["test_id"] for row in values)
+
+    export_columns = (
+        TestResult.id,
+        TestResult.test_id,
+        TestResult.username,
+        TestResult.user_email,
+        TestResult.grade,
+        TestResult.created_at,
+    )
+
+    async def stream_results(
+        self,
+        session: AsyncSession,
+        test_id: int | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[dict]:
+        """Потоковий експорт результатів (усіх або одного тесту) через серверний курсор"""
+        stmt = select(*self.export_columns).order_by(TestResult.id).execution_options(yield_per=batch_size)
+        if test_id is not None:
+            stmt = stmt.where(TestResult.test_id == test_id)
+        rows = await session.stream(stmt)
+        async for row in rows.mappings():
+            yield dict(row)
+
+    async def get_results_page(
+        self,
+        session: AsyncSession,
+        test_id: int,
+        after_id: int | None = None,
+        limit: int = 50,
+        user_email: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> tuple[list[TestResultSchema], int | None]:
+        """Keyset-пагінація результатів тесту по TestResult.id з фільтрами"""
+        try:
+            stmt = (
+                select(TestResult)
+                .where(TestResult.test_id == test_id)
+                .order_by(TestResult.id)
+                .limit(limit + 1)
+            )
+            if after_id is not None:
+                stmt = stmt.where(TestResult.id > after_id)
+            if user_email is not None:
+                stmt = stmt.where(TestResult.user_email == user_email)
+            if created_from is not None:
+                stmt = stmt.where(TestResult.created_at >= created_from)
+            if created_to is not None:
+                stmt = stmt.where(TestResult.created_at < created_to)
+
+            results = (await session.execute(stmt)).scalars().all()
+
+            has_more = len(results) > limit
+            results = results[:limit]
+            next_after_id = results[-1].id if has_more else None
+            return [result.to_pydantic() for result in results], next_after_id
+        except Exception as e:
+            exc_cls = self.exceptions.get(ActionEnum.GET, TestResultEntityException)
+            raise exc_cls(str(e))
+
+    async def get_summaries(
+        self,
+        session: AsyncSession,
+        test_ids: list[int],
+    ) -> dict[int, TestResultSummarySchema]:
+        """Кількість спроб і статистика оцінок для кожного тесту одним GROUP BY запитом"""
+        try:
+            summaries = {test_id: TestResultSummarySchema() for test_id in test_ids}
+            if not test_ids:
+                return summaries
+
+            stmt = (
+                select(
+                    TestResult.test_id,
+                    func.count().label("attempts"),
+                    func.avg(TestResult.grade).label("mean_grade"),
+                    func.percentile_cont(0.5).within_group(TestResult.grade).label("median_grade"),
+                    func.percentile_cont(0.9).within_group(TestResult.grade).label("p90_grade"),
+                    func.min(TestResult.grade).label("min_grade"),
+                    func.max(TestResult.grade).label("max_grade"),
+                )
+                .where(TestResult.test_id.in_(test_ids))
+                .group_by(TestResult.test_id)
+            )
+            for row in (await session.execute(stmt)).mappings():
+                summaries[row["test_id"]] = TestResultSummarySchema.model_validate(dict(row))
+            return summaries
+        except Exception as e:
+            exc_cls = self.exceptions.get(ActionEnum.GET, TestResultEntityException)
+            raise exc_cls(str(e))
+
+
+TestResultRepositoryDep = Annotated[TestResultRepository, Depends(TestResultRepository)]
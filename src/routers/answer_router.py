@@ -0,0 +1,106 @@
+from typing import List
+from fastapi import APIRouter
+
+from database import SessionDep
+from database.schemas import (
+    AnswerCreateSchema,
+    AnswerSchema,
+    AnswerUpdateSchema,
+    AnswerUpsertSchema,
+    PresignedUploadSchema,
+)
+from repositories.answer_repository import AnswerRepositoryDep
+from json_responses import SchemaJSONResponse
+from s3_actions import S3ClientDep
+from s3_outbox import ensure_not_queued_for_deletion
+
+
+router = APIRouter(
+    prefix="/answer",
+    tags=["Answers"]
+)
+
+@router.post('/', response_model=AnswerSchema)
+async def create_answer(
+    session: SessionDep,
+    answer_repo: AnswerRepositoryDep,
+    answer_schema: AnswerCreateSchema,
+) -> SchemaJSONResponse:
+    return SchemaJSONResponse(await answer_repo.create(session, answer_schema))
+
+
+@router.patch('/', response_model=AnswerSchema)
+async def update_answer(
+    session: SessionDep,
+    answer_repo: AnswerRepositoryDep,
+    answer_id_to_update: int,
+    answer_schema: AnswerUpdateSchema,
+) -> SchemaJSONResponse:
+    return SchemaJSONResponse(await answer_repo.update(session, answer_id_to_update, answer_schema))
+
+
+@router.delete('/')
+async def delete_answer(
+    session: SessionDep,
+    answer_repo: AnswerRepositoryDep,
+    answer_id: int,
+):
+    deleted_answer_id = await answer_repo.delete(session, answer_id)
+    return {"deleted_answer_id": deleted_answer_id}
+
+
+@router.put('/batch', response_model=List[AnswerSchema])
+async def replace_answers(
+    session: SessionDep,
+    answer_repo: AnswerRepositoryDep,
+    question_id: int,
+    answers: List[AnswerUpsertSchema],
+) -> SchemaJSONResponse:
+    """
+        Замінює весь набір відповідей питання: без id — створюються, з id — оновлюються,
+        відповіді питання, яких немає в наборі, видаляються. Повертає новий набір.
+    """
+    return SchemaJSONResponse(await answer_repo.upsert_answers(session, question_id, answers))
+
+
+@router.patch('/batch', response_model=List[AnswerSchema])
+async def patch_answers(
+    session: SessionDep,
+    answer_repo: AnswerRepositoryDep,
+    question_id: int,
+    answers: List[AnswerUpsertSchema],
+) -> SchemaJSONResponse:
+    """Як PUT /answer/batch, але відповіді, яких немає в наборі, лишаються без змін"""
+    return SchemaJSONResponse(
+        await answer_repo.upsert_answers(session, question_id, answers, delete_missing=False)
+    )
+
+
+@router.post('/attachment/upload-url', response_model=PresignedUploadSchema)
+async def get_answer_upload_url(
+    s3_client: S3ClientDep,
+    answer_id: int,
+    filename: str,
+) -> PresignedUploadSchema:
+    """
+        Presigned POST: клієнт надсилає fields і файл формою (multipart/form-data) напряму в S3,
+        а потім викликає /attachment/confirm з тим самим answer_id і key.
+    """
+    key = s3_client.attachment_key("answers/", answer_id, filename)
+    upload = s3_client.presigned_post(key)
+    return PresignedUploadSchema(
+        key=key, url=upload["url"], fields=upload["fields"], expires_in=s3_client.url_expires
+    )
+
+
+@router.post('/attachment/confirm', response_model=AnswerSchema)
+async def confirm_answer_attachment(
+    session: SessionDep,
+    answer_repo: AnswerRepositoryDep,
+    s3_client: S3ClientDep,
+    answer_id: int,
+    key: str,
+) -> SchemaJSONResponse:
+    await ensure_not_queued_for_deletion(session, key)
+    await s3_client.ensure_uploaded(key, prefix=f"answers/{answer_id}/")
+    return SchemaJSONResponse(await answer_repo.update_file_path(session, answer_id, key))
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from lifecycle import resources
+
+
+router = APIRouter(
+    tags=["Health"]
+)
+
+@router.get('/healthz', include_in_schema=False)
+async def healthz() -> JSONResponse:
+    """Liveness: процес живий і event loop відповідає; залежності не перевіряються"""
+    return JSONResponse({"status": "ok"})
+
+
+@router.get('/readyz', include_in_schema=False)
+async def readyz() -> JSONResponse:
+    """Readiness: пул БД і S3 прогріті, зупинка не почалась"""
+    if resources.ready:
+        return JSONResponse({"status": "ready"})
+    return JSONResponse(
+        {"status": "draining" if resources.draining else "starting"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from metrics import latest
+
+
+router = APIRouter(
+    tags=["Metrics"]
+)
+
+@router.get('/metrics', include_in_schema=False)
+async def get_metrics() -> Response:
+    return Response(content=latest(), media_type=CONTENT_TYPE_LATEST)
@@ -3,9 +3,11 @@ import uuid
 from fastapi import APIRouter, UploadFile, File
 
 from database import SessionDep
-from database.schemas import QuestionSchema, QuestionCreateSchema, QuestionUpdateSchema
+from database.schemas import PresignedUploadSchema, QuestionSchema, QuestionCreateSchema, QuestionUpdateSchema
 from repositories.question_repository import QuestionRepositoryDep
+from json_responses import SchemaJSONResponse
 from s3_actions import S3ClientDep
+from s3_outbox import enqueue_orphaned_upload, ensure_not_queued_for_deletion
 
 
 router = APIRouter(
@@ -22,13 +24,21 @@ async def create_question(
     test_id: int,
     description: Optional[str] = None,
     file: Optional[UploadFile] = File(None),
-) -> QuestionSchema:
+) -> SchemaJSONResponse:
     question_schema = QuestionCreateSchema(title=title, description=description, test_id=test_id)
     
     if file:
         s3_file_path = f"questions/{uuid.uuid4()}_{file.filename}"
         await s3_client.upload_file(file, key=s3_file_path)
-    return await question_repo.create(session, question_schema)
+        question_schema.s3_file_path = s3_file_path
+    try:
+        question = await question_repo.create(session, question_schema)
+    except Exception:
+        # Файл уже в S3, а питання не створено: інакше він лишився б у бакеті назавжди
+        if question_schema.s3_file_path:
+            await enqueue_orphaned_upload(question_schema.s3_file_path)
+        raise
+    return SchemaJSONResponse(question)
 
 
 @router.patch('/', response_model=QuestionSchema)
@@ -40,14 +50,20 @@ async def update_question(
     title: Optional[str] = None,
     description: Optional[str] = None,
     file: UploadFile = File(None),
-) -> QuestionSchema:
+) -> SchemaJSONResponse:
     question_schema = QuestionUpdateSchema(title=title, description=description)
     new_s3_file_path = None
 
     if file:
         new_s3_file_path = f"questions/{uuid.uuid4()}_{file.filename}"
         await s3_client.upload_file(file, key=new_s3_file_path)
-    return await question_repo.update_question(session, question_id_to_update, question_schema, new_s3_file_path)
+    try:
+        question = await question_repo.update_question(session, question_id_to_update, question_schema, new_s3_file_path)
+    except Exception:
+        if new_s3_file_path:
+            await enqueue_orphaned_upload(new_s3_file_path)
+        raise
+    return SchemaJSONResponse(question)
 
 
 @router.delete('/')
@@ -56,4 +72,34 @@ async def delete_question(
     question_repo: QuestionRepositoryDep,
     question_id: int,
 ) -> None:
-    return await question_repo.delete(session, question_id)
\ No newline at end of file
+    return await question_repo.delete(session, question_id)
+
+
+@router.post('/attachment/upload-url', response_model=PresignedUploadSchema)
+async def get_question_upload_url(
+    s3_client: S3ClientDep,
+    question_id: int,
+    filename: str,
+) -> PresignedUploadSchema:
+    """
+        Presigned POST: клієнт надсилає fields і файл формою (multipart/form-data) напряму в S3,
+        а потім викликає /attachment/confirm з тим самим question_id і key.
+    """
+    key = s3_client.attachment_key("questions/", question_id, filename)
+    upload = s3_client.presigned_post(key)
+    return PresignedUploadSchema(
+        key=key, url=upload["url"], fields=upload["fields"], expires_in=s3_client.url_expires
+    )
+
+
+@router.post('/attachment/confirm', response_model=QuestionSchema)
+async def confirm_question_attachment(
+    session: SessionDep,
+    question_repo: QuestionRepositoryDep,
+    s3_client: S3ClientDep,
+    question_id: int,
+    key: str,
+) -> SchemaJSONResponse:
+    await ensure_not_queued_for_deletion(session, key)
+    await s3_client.ensure_uploaded(key, prefix=f"questions/{question_id}/")
+    return SchemaJSONResponse(await question_repo.update_question(session, question_id, QuestionUpdateSchema(), key))
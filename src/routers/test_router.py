@@ -1,9 +1,28 @@
-from typing import List, Optional
-from fastapi import APIRouter
+from datetime import datetime
+from typing import Annotated, Iterable, List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
 from database import SessionDep
-from database.schemas import TestSchema, TestCreateSchema, TestUpdateSchema
-from repositories.test_repository import TestRepositoryDep
+from database.schemas import (
+    BulkResultSchema,
+    GradedTestResultSchema,
+    PageSchema,
+    TestSchema,
+    TestSummarySchema,
+    TestCreateSchema,
+    TestUpdateSchema,
+    TestResultCreateSchema,
+    TestResultSchema,
+    TestResultSummarySchema,
+    TestSubmissionSchema,
+)
+from export import MEDIA_TYPES, export_results, export_tests
+from ndjson import iter_rows
+from pagination import decode_cursor, encode_cursor
+from repositories.test_repository import TestRepository, TestRepositoryDep
+from repositories.test_result_repository import TestResultRepositoryDep
+from json_responses import SchemaJSONResponse
 
 
 router = APIRouter(
@@ -11,15 +30,196 @@ router = APIRouter(
     tags=["Tests"]
 )
 
-@router.get('/', response_model=List[TestSchema])
+def parse_names(value: str | None, allowed: Iterable[str], parameter: str) -> set[str]:
+    """Список через кому; невідомі значення — 400, а не тихе ігнорування"""
+    if not value:
+        return set()
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown {parameter} value(s): {', '.join(sorted(unknown))}"
+        )
+    return names
+
+
+def parse_expand(
+    expand: Annotated[
+        Optional[str],
+        Query(description=f"Comma-separated relations to include: {', '.join(TestRepository.expansions)}"),
+    ] = None,
+) -> set[str]:
+    return parse_names(expand, TestRepository.expansions, "expand")
+
+
+def parse_fields(
+    expand: Annotated[set[str], Depends(parse_expand)],
+    fields: Annotated[
+        Optional[str],
+        Query(description=(
+            "Lightweight list: comma-separated test columns to return besides id "
+            f"({', '.join(TestRepository.summary_fields)}); cannot be combined with expand"
+        )),
+    ] = None,
+) -> set[str]:
+    names = parse_names(fields, TestRepository.summary_fields, "fields")
+    if names and expand:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="fields returns test columns only and cannot be combined with expand"
+        )
+    return names
+
+
+ExpandDep = Annotated[set[str], Depends(parse_expand)]
+FieldsDep = Annotated[set[str], Depends(parse_fields)]
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """Слабке порівняння ETag зі списком у If-None-Match (RFC 9110)"""
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+@router.get('/', response_model=List[Union[TestSchema, TestSummarySchema]])
 async def get_tests(
     session: SessionDep,
     test_repo: TestRepositoryDep,
+    expand: ExpandDep,
+    fields: FieldsDep,
     test_id: Optional[int] = None,
     skip: Optional[int] = 0,
-    limit: Optional[int] = 10
-) -> List[TestSchema]:
-    return await test_repo.get_tests(session, skip, limit, test_id)
+    limit: Optional[int] = 10,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+) -> Response:
+    """
+        Незапитані через expand зв'язки не завантажуються і повертаються як null;
+        з fields= повертаються лише id і ці колонки (TestSummarySchema) одним вузьким запитом.
+        Для одного тесту (test_id) віддається ETag; If-None-Match з ним дає 304 Not Modified
+        після одного агрегатного запиту версії, без завантаження питань і відповідей.
+    """
+    if test_id is not None and not skip and not fields:
+        version = await test_repo.get_test_version(session, test_id, expand)
+        if version is not None:
+            etag = f'"{version}"'
+            if if_none_match is not None and etag_matches(etag, if_none_match):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            payload = await test_repo.get_test_payload(session, test_id, expand, version)
+            return SchemaJSONResponse(payload, headers={"ETag": etag})
+    return SchemaJSONResponse(await test_repo.get_tests(session, skip, limit, test_id, expand, fields))
+
+
+@router.get('/page', response_model=PageSchema[Union[TestSchema, TestSummarySchema]])
+async def get_tests_page(
+    session: SessionDep,
+    test_repo: TestRepositoryDep,
+    expand: ExpandDep,
+    fields: FieldsDep,
+    cursor: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=100),
+) -> SchemaJSONResponse:
+    """Keyset-пагінація: передайте next_cursor з попередньої відповіді (або after_id)"""
+    if cursor is not None:
+        after_id = decode_cursor(cursor, id=int)["id"]
+    tests, next_after_id = await test_repo.get_tests_page(session, after_id, limit, expand, fields)
+    return SchemaJSONResponse({
+        "items": tests,
+        "next_cursor": encode_cursor(id=next_after_id) if next_after_id is not None else None,
+    })
+
+
+ExportFormat = Annotated[Literal["ndjson", "csv"], Query(alias="format")]
+
+
+@router.get('/export', response_class=StreamingResponse)
+async def export_tests_stream(
+    expand: ExpandDep,
+    export_format: ExportFormat = "ndjson",
+) -> StreamingResponse:
+    """
+        Потоковий експорт каталогу тестів; пам'ять не залежить від розміру таблиці.
+        expand (questions, questions.answers) підтримується лише для NDJSON.
+    """
+    if expand and (export_format == "csv" or "results_summary" in expand):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Export supports expand=questions,questions.answers with format=ndjson only"
+        )
+    return StreamingResponse(
+        export_tests(export_format, expand),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tests.{export_format}"'},
+    )
+
+
+@router.get('/results/export', response_class=StreamingResponse)
+async def export_test_results_stream(
+    test_id: Optional[int] = None,
+    export_format: ExportFormat = "ndjson",
+) -> StreamingResponse:
+    """Потоковий експорт історії результатів (усіх тестів або одного)"""
+    return StreamingResponse(
+        export_results(export_format, test_id),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="results.{export_format}"'},
+    )
+
+
+@router.get('/results', response_model=PageSchema[TestResultSchema])
+async def get_test_results(
+    session: SessionDep,
+    test_result_repo: TestResultRepositoryDep,
+    test_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    user_email: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> SchemaJSONResponse:
+    after_id = decode_cursor(cursor, id=int)["id"] if cursor is not None else None
+    results, next_after_id = await test_result_repo.get_results_page(
+        session, test_id, after_id, limit, user_email, created_from, created_to
+    )
+    return SchemaJSONResponse(PageSchema[TestResultSchema](
+        items=results,
+        next_cursor=encode_cursor(id=next_after_id) if next_after_id is not None else None,
+    ))
+
+
+@router.get('/results/summary', response_model=TestResultSummarySchema)
+async def get_test_results_summary(
+    session: SessionDep,
+    test_result_repo: TestResultRepositoryDep,
+    test_id: int,
+) -> SchemaJSONResponse:
+    summaries = await test_result_repo.get_summaries(session, [test_id])
+    return SchemaJSONResponse(summaries[test_id])
+
+
+@router.post(
+    '/results/bulk',
+    response_model=BulkResultSchema,
+    openapi_extra={"requestBody": {"content": {
+        "application/json": {"schema": {"type": "array", "items": TestResultCreateSchema.model_json_schema()}},
+        "application/x-ndjson": {"schema": {"type": "string"}},
+    }}},
+)
+async def bulk_create_test_results(
+    session: SessionDep,
+    test_result_repo: TestResultRepositoryDep,
+    request: Request,
+) -> SchemaJSONResponse:
+    """
+        Пакетне збереження результатів: JSON-масив або NDJSON (Content-Type: application/x-ndjson).
+        Невалідні рядки не зупиняють запис решти і повертаються в errors з індексом.
+    """
+    return SchemaJSONResponse(await test_result_repo.bulk_create(session, iter_rows(request)))
 
 
 @router.post('/', response_model=TestSchema)
@@ -27,8 +227,41 @@ async def create_test(
     session: SessionDep,
     test_repo: TestRepositoryDep,
     test_schema: TestCreateSchema
-) -> TestSchema:
-    return await test_repo.create(session, test_schema)
+) -> SchemaJSONResponse:
+    return SchemaJSONResponse(await test_repo.create(session, test_schema))
+
+
+@router.post('/{test_id}/submit', response_model=GradedTestResultSchema)
+async def submit_test(
+    session: SessionDep,
+    test_result_repo: TestResultRepositoryDep,
+    test_id: int,
+    submission: TestSubmissionSchema,
+) -> SchemaJSONResponse:
+    """Оцінює спробу на сервері та зберігає результат"""
+    return SchemaJSONResponse(await test_result_repo.submit(session, test_id, submission))
+
+
+@router.post(
+    '/import',
+    response_model=BulkResultSchema,
+    openapi_extra={"requestBody": {"content": {
+        # Вкладені схеми ($defs) не можна вбудувати сюди, тож формат описано в TestImportSchema
+        "application/json": {"schema": {"anyOf": [{"type": "object"}, {"type": "array", "items": {"type": "object"}}]}},
+        "application/x-ndjson": {"schema": {"type": "string"}},
+    }}},
+)
+async def import_tests(
+    session: SessionDep,
+    test_repo: TestRepositoryDep,
+    request: Request,
+) -> SchemaJSONResponse:
+    """
+        Імпорт тестів разом з питаннями та відповідями в одній транзакції:
+        один документ TestImportSchema, JSON-масив документів або NDJSON (документ на рядок).
+        ids — id створених тестів у порядку документів.
+    """
+    return SchemaJSONResponse(await test_repo.import_tests(session, iter_rows(request, allow_object=True)))
 
 
 @router.patch('/', response_model=TestSchema)
@@ -37,8 +270,8 @@ async def update_test(
     test_repo: TestRepositoryDep,
     test_id_to_update: int,
     test_schema: TestUpdateSchema
-) -> TestSchema:
-    return await test_repo.update(session, test_id_to_update, test_schema)
+) -> SchemaJSONResponse:
+    return SchemaJSONResponse(await test_repo.update(session, test_id_to_update, test_schema))
 
 
 @router.delete('/')
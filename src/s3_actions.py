@@ -1,55 +1,299 @@
-from typing import Annotated
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Annotated, Any, Callable
 from fastapi import Depends, HTTPException, UploadFile, status
 from config import settings
-import boto3
+from metrics import S3_CALL_DURATION
+
+
+logger = logging.getLogger(__name__)
+
+class lazy_class_attribute:
+    """
+        Атрибут класу, що обчислюється при першому зверненні і замінює себе значенням.
+        Так імпорт модуля не завантажує моделі botocore і не читає налаштування AWS.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self.lock = threading.Lock()
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        with self.lock:
+            value = owner.__dict__.get(self.name, self)
+            if value is self:
+                value = self.factory()
+                setattr(owner, self.name, value)
+        return value
+
+
+def _create_client():
+    import boto3
+    from botocore.config import Config
+
+    # boto3 clients are thread-safe (resources are not), so a single client
+    # with a pooled HTTP session is shared by every worker thread.
+    return boto3.client(
+        's3',
+        endpoint_url=settings.aws.aws_endpoint_url,
+        config=Config(max_pool_connections=settings.aws.s3_max_workers),
+    )
 
 
 class S3Client:
-    s3 = boto3.resource('s3')
-    bucket = s3.Bucket(settings.aws.bucket_name)
+    client = lazy_class_attribute(_create_client)
+    bucket_name = lazy_class_attribute(lambda: settings.aws.bucket_name)
+    max_file_size = lazy_class_attribute(lambda: settings.aws.s3_max_file_size)
+    chunk_size = lazy_class_attribute(lambda: settings.aws.s3_chunk_size)
+    executor = lazy_class_attribute(lambda: ThreadPoolExecutor(
+        max_workers=settings.aws.s3_max_workers,
+        thread_name_prefix="s3",
+    ))
+    url_expires = lazy_class_attribute(lambda: settings.aws.s3_presigned_url_expires)
+    # key -> (presigned GET url, moment when it must be re-signed)
+    _url_cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+    _url_cache_size = 10_000
+
+    @classmethod
+    async def run(cls, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Виконує блокуючий виклик boto3 у пулі потоків, не блокуючи event loop"""
+        loop = asyncio.get_running_loop()
+        with S3_CALL_DURATION.labels(operation=func.__name__).time():
+            return await loop.run_in_executor(cls.executor, partial(func, *args, **kwargs))
+
+    @staticmethod
+    def attachment_key(prefix: str, entity_id: int, filename: str) -> str:
+        """
+            Ключ вкладення прив'язаний до сутності: id у шляху та випадковий nonce.
+            Confirm приймає лише ключі з префіксом своєї сутності, тож чужий файл не підтвердити.
+        """
+        return f"{prefix}{entity_id}/{uuid.uuid4().hex}_{filename}"
+
+    @classmethod
+    def presigned_post(cls, key: str) -> dict:
+        """
+            Підписує POST-форму для прямого завантаження файлу в S3 (без мережевого запиту).
+            content-length-range змушує S3 відхилити файл, більший за s3_max_file_size.
+        """
+        return cls.client.generate_presigned_post(
+            Bucket=cls.bucket_name,
+            Key=key,
+            Conditions=[["content-length-range", 1, cls.max_file_size]],
+            ExpiresIn=cls.url_expires,
+        )
+
+    @classmethod
+    def presigned_get_url(cls, key: str) -> str:
+        """
+            Підписує GET URL для файлу. Підпис кешується для ключа
+            на половину терміну дії, тож клієнт завжди має запас часу.
+        """
+        now = time.monotonic()
+        cached = cls._url_cache.get(key)
+        if cached and cached[1] > now:
+            cls._url_cache.move_to_end(key)
+            return cached[0]
+
+        url = cls.client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': cls.bucket_name, 'Key': key},
+            ExpiresIn=cls.url_expires,
+        )
+        cls._url_cache[key] = (url, now + cls.url_expires / 2)
+        cls._url_cache.move_to_end(key)
+        if len(cls._url_cache) > cls._url_cache_size:
+            cls._url_cache.popitem(last=False)
+        return url
+
+    @classmethod
+    async def file_size(cls, key: str) -> int | None:
+        """Розмір об'єкта в байтах або None, якщо його немає"""
+        from botocore.exceptions import ClientError
+
+        try:
+            response = await cls.run(cls.client.head_object, Bucket=cls.bucket_name, Key=key)
+        except ClientError:
+            return None
+        return response["ContentLength"]
+
+    async def ensure_uploaded(self, key: str, prefix: str) -> None:
+        """Перевіряє, що клієнт завантажив файл за ключем цієї сутності і що він не більший за ліміт"""
+        size = await self.file_size(key) if key.startswith(prefix) else None
+        if size is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File {key} was not uploaded"
+            )
+        if size > self.max_file_size:
+            await self.delete_files([key])
+            raise self._size_exceeded()
+
+    def _size_exceeded(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Supported file size is 0 - {self.max_file_size // (1024 * 1024)} MB'
+        )
 
     async def upload_file(
-        self, 
+        self,
         file: UploadFile,
-        key: str, 
+        key: str,
     ) -> None:
+        """
+            Стрімить файл у S3 частинами по chunk_size: у пам'яті
+            тримається лише одна частина, розмір перевіряється під час читання.
+        """
         if not file:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail='No file found!!'
             )
-        contents = await file.read()
-        size = len(contents)
-        if not 0 < size <= 200 * 1024: # 200 MB
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f'Supported file size is 0 - 200 MB'
+        if file.size is not None and file.size > self.max_file_size:
+            raise self._size_exceeded()
+
+        chunk = await file.read(self.chunk_size)
+        if not chunk:
+            raise self._size_exceeded()
+
+        next_chunk = await file.read(self.chunk_size)
+        if not next_chunk:
+            # Малий файл вміщується в одну частину — звичайний put_object
+            response = await self.run(
+                self.client.put_object,
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=chunk,
             )
+            if response['ResponseMetadata']['HTTPStatusCode'] != 200:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Error during loading file {file.filename}"
+                )
+            return
 
-        s3_object = self.bucket.put_object(Key=key, Body=contents)
-        if not s3_object:
+        await self._upload_multipart(file, key, chunk, next_chunk)
+
+    async def _upload_multipart(
+        self,
+        file: UploadFile,
+        key: str,
+        first_chunk: bytes,
+        second_chunk: bytes,
+    ) -> None:
+        upload = await self.run(
+            self.client.create_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=key,
+        )
+        upload_id = upload['UploadId']
+        parts = []
+        size = 0
+        try:
+            chunk, next_chunk = first_chunk, second_chunk
+            while chunk:
+                size += len(chunk)
+                if size > self.max_file_size:
+                    raise self._size_exceeded()
+
+                part_number = len(parts) + 1
+                response = await self.run(
+                    self.client.upload_part,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=chunk,
+                )
+                parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+
+                chunk, next_chunk = next_chunk, (
+                    await file.read(self.chunk_size) if next_chunk else b''
+                )
+
+            await self.run(
+                self.client.complete_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts},
+            )
+        except Exception as e:
+            try:
+                await self.run(
+                    self.client.abort_multipart_upload,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                )
+            except Exception:
+                # Помилка abort не повинна підмінити причину збою завантаження
+                logger.exception("Failed to abort multipart upload %s of %s", upload_id, key)
+            if isinstance(e, HTTPException):
+                raise
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Error during loading file {file.filename}"
             )
-        
+
     @staticmethod
     async def delete_file(
         key: str,
     ) -> None:
-        response = S3Client.bucket.delete_objects(
-            Delete={
-                'Objects': [
-                    {
-                        'Key': key
-                    }
-                ]
-            }
-        )
-        if response['ResponseMetadata']['HTTPStatusCode'] != 200:
+        errors = await S3Client.delete_files([key])
+        if errors:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Error during deletion file {key}"
             )
-        
-S3ClientDep = Annotated[S3Client, Depends(S3Client)]
\ No newline at end of file
+
+    @staticmethod
+    async def delete_files(
+        keys: list[str],
+    ) -> dict[str, str]:
+        """
+            Видаляє до 1000 ключів одним запитом delete_objects.
+            Повертає {key: error} для ключів, які не вдалося видалити.
+        """
+        response = await S3Client.run(
+            S3Client.client.delete_objects,
+            Bucket=S3Client.bucket_name,
+            Delete={
+                'Objects': [{'Key': key} for key in keys],
+                'Quiet': True,
+            }
+        )
+        return {
+            error['Key']: f"{error.get('Code')}: {error.get('Message')}"
+            for error in response.get('Errors', [])
+        }
+
+    @classmethod
+    async def warm_up(cls) -> None:
+        """
+            Створює клієнт у потоці (завантаження моделей botocore блокує) і відкриває
+            HTTP-з'єднання з S3 через head_bucket, щоб перший запит не платив за це.
+        """
+        await asyncio.to_thread(lambda: cls.client)
+        try:
+            await cls.run(cls.client.head_bucket, Bucket=cls.bucket_name)
+        except Exception:
+            logger.warning("S3 warm-up request failed", exc_info=True)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Зупиняє пул потоків, не чекаючи завислих викликів: дедлайн зупинки вже вичерпано"""
+        executor = vars(cls)["executor"]
+        if not isinstance(executor, lazy_class_attribute):
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+S3ClientDep = Annotated[S3Client, Depends(S3Client)]
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Iterable
+from fastapi import HTTPException, status
+from sqlalchemy import Select, CompoundSelect, delete, exists, func, insert, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import session_factory
+from database.models import Answer, Question, S3DeletionOutbox
+from metrics import S3_OUTBOX_DELETED, S3_OUTBOX_DEPTH, S3_OUTBOX_FAILED
+from s3_actions import S3Client
+
+
+logger = logging.getLogger(__name__)
+
+S3_DELETE_BATCH_SIZE = 1000  # Максимум ключів в одному delete_objects
+MAX_RETRY_DELAY = 3600
+
+
+def enqueue_s3_deletion(session: AsyncSession, keys: Iterable[str | None]) -> None:
+    """
+        Додає ключі до outbox у поточній транзакції:
+        файли видаляються з S3 лише якщо транзакція буде закомічена.
+    """
+    session.add_all([S3DeletionOutbox(key=key) for key in keys if key])
+
+
+async def enqueue_s3_deletion_from(
+    session: AsyncSession,
+    keys_query: Select | CompoundSelect,
+) -> None:
+    """
+        Ставить у чергу ключі, вибрані запитом, одним INSERT ... SELECT:
+        ключі не передаються в Python і не залежать від кількості рядків.
+    """
+    await session.execute(
+        insert(S3DeletionOutbox).from_select(["key"], keys_query, include_defaults=False)
+    )
+
+
+async def enqueue_orphaned_upload(key: str) -> None:
+    """
+        Файл завантажено в S3 до запису в БД, а запис не вдався: сесія запиту вже відкочена,
+        тож ключ ставиться в чергу окремою транзакцією — і лише якщо на нього не посилається
+        жоден рядок (помилка могла статися вже після коміту).
+    """
+    referenced = union_all(
+        select(Question.id).where(Question.s3_file_path == key),
+        select(Answer.id).where(Answer.s3_file_path == key),
+    )
+    try:
+        async with session_factory() as session:
+            await enqueue_s3_deletion_from(session, select(literal(key)).where(~exists(referenced)))
+            await session.commit()
+    except Exception:
+        logger.exception("Failed to queue orphaned upload %s for deletion", key)
+
+
+async def ensure_not_queued_for_deletion(session: AsyncSession, key: str) -> None:
+    """Ключ, уже поставлений у чергу на видалення (замінений файл), не можна прикріпити знову"""
+    if await session.scalar(select(S3DeletionOutbox.id).where(S3DeletionOutbox.key == key).limit(1)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File {key} is scheduled for deletion"
+        )
+
+
+async def drain_s3_deletion_outbox(session: AsyncSession) -> int:
+    """Видаляє з S3 одну пачку ключів з outbox. Повертає кількість оброблених записів"""
+    stmt = (
+        select(S3DeletionOutbox)
+        .where(
+            S3DeletionOutbox.next_attempt_at <= func.now(),
+            S3DeletionOutbox.attempts < settings.aws.s3_outbox_max_attempts,
+        )
+        .order_by(S3DeletionOutbox.id)
+        .limit(S3_DELETE_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    rows = (await session.execute(stmt)).scalars().all()
+    if not rows:
+        await session.commit()
+        return 0
+
+    try:
+        errors = await S3Client.delete_files([row.key for row in rows])
+    except Exception as e:
+        errors = {row.key: str(e) for row in rows}
+
+    deleted_ids = [row.id for row in rows if row.key not in errors]
+    if deleted_ids:
+        await session.execute(
+            delete(S3DeletionOutbox).where(S3DeletionOutbox.id.in_(deleted_ids))
+        )
+
+    for row in rows:
+        if row.key in errors:
+            delay = min(settings.aws.s3_outbox_poll_interval * 2 ** row.attempts, MAX_RETRY_DELAY)
+            row.attempts += 1
+            row.last_error = errors[row.key]
+            row.next_attempt_at = func.now() + timedelta(seconds=delay)
+
+    await session.commit()
+
+    S3_OUTBOX_DELETED.inc(len(deleted_ids))
+    S3_OUTBOX_FAILED.inc(len(rows) - len(deleted_ids))
+    return len(rows)
+
+
+async def run_s3_deletion_worker(stop: asyncio.Event) -> None:
+    """Фоновий цикл, що розвантажує outbox, поки не буде встановлено stop"""
+    while not stop.is_set():
+        processed = 0
+        try:
+            async with session_factory() as session:
+                processed = await drain_s3_deletion_outbox(session)
+                S3_OUTBOX_DEPTH.set(
+                    await session.scalar(select(func.count()).select_from(S3DeletionOutbox))
+                )
+        except Exception:
+            logger.exception("S3 deletion outbox drain failed")
+
+        if processed < S3_DELETE_BATCH_SIZE:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.aws.s3_outbox_poll_interval)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,86 @@
+"""
+Production entry point: uvicorn with several worker processes.
+
+    cd src && python server.py
+
+Workers, event loop (uvloop), HTTP parser (httptools), keep-alive and the
+graceful shutdown window come from ServerSettings (WEB_* variables). Each
+worker gets its share of DB_MAX_CONNECTIONS, see database.pool_limits.
+With several workers Prometheus metrics are collected in multiprocess mode
+in PROMETHEUS_MULTIPROC_DIR (a temporary directory unless set), so /metrics
+of any worker reports the whole instance.
+For local development with auto-reload use `uvicorn main:app --reload`.
+"""
+import glob
+import logging
+import os
+import shutil
+import tempfile
+import uvicorn
+from config import settings
+from logging_config import configure_logging
+from metrics import MULTIPROCESS_DIR_VARIABLE
+
+
+logger = logging.getLogger(__name__)
+
+def prepare_metrics_dir() -> str | None:
+    """
+        Каталог multiprocess-метрик для воркерів. Повертає шлях, якщо його створено тут
+        (тоді він видаляється після зупинки); заданий ззовні очищується від файлів минулого запуску.
+    """
+    metrics_dir = os.environ.get(MULTIPROCESS_DIR_VARIABLE)
+    if metrics_dir:
+        for path in glob.glob(os.path.join(metrics_dir, "*.db")):
+            os.remove(path)
+        return None
+    metrics_dir = tempfile.mkdtemp(prefix="prometheus-")
+    os.environ[MULTIPROCESS_DIR_VARIABLE] = metrics_dir
+    return metrics_dir
+
+
+def main() -> None:
+    configure_logging()
+    server = settings.server
+    if server.workers > 1 and not settings.cache.cache_redis_url:
+        logger.warning(
+            "CACHE_REDIS_URL is not set: each of %d workers fills its own test cache and answer keys "
+            "are read from the database on every submit",
+            server.workers,
+        )
+    max_connections = settings.db.db_max_connections
+    if max_connections and server.workers > max_connections:
+        raise SystemExit(
+            f"DB_MAX_CONNECTIONS={max_connections} is less than one connection per worker "
+            f"({server.workers} workers): raise it or set WEB_WORKERS"
+        )
+    # Воркери стартують як окремі процеси: фіксуємо їх кількість у середовищі,
+    # щоб кожен ділив бюджет з'єднань з БД на те саме число
+    os.environ["WEB_WORKERS"] = str(server.workers)
+    # Кожен воркер має власний реєстр метрик: без спільного каталогу /metrics показував би
+    # лічильники лише того воркера, що відповів
+    created_metrics_dir = prepare_metrics_dir() if server.workers > 1 else None
+    try:
+        uvicorn.run(
+            "main:app",
+            host=server.web_host,
+            port=server.web_port,
+            workers=server.workers,
+            loop=server.web_loop,
+            http=server.web_http,
+            timeout_keep_alive=server.web_keep_alive,
+            backlog=server.web_backlog,
+            limit_max_requests=server.web_limit_max_requests,
+            # Той самий бюджет, що й у lifespan (AppResources.begin_draining): запити в роботі
+            # і фонові задачі разом вкладаються в shutdown_drain_timeout, а не по черзі
+            timeout_graceful_shutdown=max(1, int(settings.app.shutdown_drain_timeout)),
+            proxy_headers=True,
+            access_log=False,
+        )
+    finally:
+        if created_metrics_dir:
+            shutil.rmtree(created_metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    """Асинхронні тести (@pytest.mark.anyio) виконуються на asyncio, як і застосунок"""
+    return "asyncio"
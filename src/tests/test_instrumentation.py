@@ -0,0 +1,196 @@
+import logging
+import pytest
+import sqlalchemy
+from sqlalchemy.pool import StaticPool
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from config import AppSettings, settings
+from instrumentation import (
+    MetricsMiddleware,
+    QueryBudgetExceeded,
+    allow_batched_queries,
+    instrument_engine,
+    track_queries,
+)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    # Одне з'єднання для всіх потоків: TestClient виконує застосунок в окремому потоці
+    engine = sqlalchemy.create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    instrument_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+def run_queries(engine, count: int, repeated: bool = False) -> None:
+    """count різних інструкцій або, з repeated, одна й та сама count разів (як N+1)"""
+    with engine.connect() as connection:
+        for i in range(count):
+            connection.execute(sqlalchemy.text("SELECT 1" if repeated else f"SELECT {i}"))
+
+
+@pytest.fixture
+def app_settings(monkeypatch):
+    """Підміняє секцію settings.app (SQL_QUERY_BUDGET, SQL_STRICT, ...) на час тесту"""
+
+    def configure(**values) -> None:
+        monkeypatch.setitem(vars(settings), "app", AppSettings(**values))
+
+    return configure
+
+
+@pytest.fixture
+def app(engine):
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/queries/{count}")
+    async def queries(count: int, repeated: bool = False):
+        run_queries(engine, count, repeated)
+        return {"ok": True}
+
+    return app
+
+
+def streaming_app(engine, count: int):
+    """ASGI-застосунок, що виконує SQL уже після надсилання заголовків, як потокові експорти"""
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        for i in range(count):
+            run_queries(engine, 1)
+            await send({"type": "http.response.body", "body": f"{i}\n".encode(), "more_body": i < count - 1})
+
+    return app
+
+
+async def call(app, messages: list) -> None:
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await MetricsMiddleware(app)({"type": "http", "method": "GET", "path": "/stream"}, receive, send)
+
+
+@pytest.fixture
+def client(app):
+    with TestClient(app) as client:
+        yield client
+
+
+def test_track_queries_counts_statements(engine):
+    with track_queries(budget=2) as stats:
+        run_queries(engine, 2)
+    assert stats.queries == 2
+
+
+def test_track_queries_raises_over_budget(engine):
+    with pytest.raises(QueryBudgetExceeded, match="3 SQL statements, budget is 2"):
+        with track_queries(budget=2):
+            run_queries(engine, 3)
+
+
+def test_zero_budget_means_no_sql(engine):
+    with pytest.raises(QueryBudgetExceeded):
+        with track_queries(budget=0):
+            run_queries(engine, 1)
+
+
+def test_track_queries_flags_repeated_statement(engine):
+    with pytest.raises(QueryBudgetExceeded, match=r"4x the same statement \(N\+1\?\): SELECT 1"):
+        with track_queries(repeat_threshold=4):
+            run_queries(engine, 4, repeated=True)
+
+
+def test_batched_queries_are_not_checked(engine):
+    with track_queries(budget=1, repeat_threshold=2) as stats:
+        allow_batched_queries()
+        run_queries(engine, 3, repeated=True)
+    assert stats.queries == 3
+
+
+def test_queries_outside_request_are_not_counted(engine):
+    with track_queries() as stats:
+        pass
+    run_queries(engine, 2)
+    assert stats.queries == 0
+
+
+def test_over_budget_request_is_logged(client, app_settings, caplog):
+    app_settings(sql_query_budget=3)
+    response = client.get("/queries/4")
+    assert response.status_code == 200
+    assert [(record.levelno, record.getMessage()) for record in caplog.records] == [
+        (logging.WARNING, "GET /queries/{count} executed 4 SQL statements, budget is 3"),
+    ]
+
+
+def test_budget_counter_is_reset_per_request(client, app_settings, caplog):
+    app_settings(sql_query_budget=3)
+    # Разом 4 інструкції, але кожен запит виконав лише 2: бюджет не перевищено
+    for _ in range(2):
+        assert client.get("/queries/2").status_code == 200
+    assert caplog.records == []
+
+
+def test_repeated_statement_in_request_is_logged(client, app_settings, caplog):
+    app_settings(sql_repeat_threshold=3)
+    assert client.get("/queries/3?repeated=true").status_code == 200
+    assert "repeated a SQL statement 3 times (N+1?): SELECT 1" in caplog.text
+
+
+def test_strict_mode_replaces_over_budget_response(client, app_settings, caplog):
+    app_settings(sql_query_budget=3, sql_strict=True)
+    response = client.get("/queries/4")
+    assert response.status_code == 500
+    assert response.headers["x-db-queries"] == "4"
+    assert response.json() == {
+        "detail": "SQL query budget violated",
+        "problems": ["4 SQL statements, budget is 3"],
+    }
+    # Порушення вже видно у відповіді, тож у лозі воно лишається попередженням
+    assert [record.levelno for record in caplog.records] == [logging.WARNING]
+
+
+def test_strict_mode_replaces_repeated_statement_response(client, app_settings):
+    app_settings(sql_repeat_threshold=3, sql_strict=True)
+    response = client.get("/queries/3?repeated=true")
+    assert response.status_code == 500
+    assert response.json()["problems"] == ["3x the same statement (N+1?): SELECT 1"]
+
+
+def test_strict_mode_passes_request_within_budget(client, app_settings):
+    app_settings(sql_query_budget=3, sql_strict=True)
+    for _ in range(2):
+        response = client.get("/queries/3")
+        assert response.status_code == 200
+        assert response.headers["x-db-queries"] == "3"
+
+
+@pytest.mark.anyio
+async def test_strict_mode_aborts_streamed_response(engine, app_settings, caplog):
+    app_settings(sql_query_budget=3, sql_strict=True)
+    messages = []
+    # Статус 200 уже надіслано: останній фрагмент не віддається, а помилка доходить до сервера,
+    # який обриває з'єднання, тож клієнт не отримує неповне тіло як успішне
+    with pytest.raises(QueryBudgetExceeded, match="4 SQL statements, budget is 3"):
+        await call(streaming_app(engine, 4), messages)
+    assert [message.get("body") for message in messages[1:]] == [b"0\n", b"1\n", b"2\n"]
+    assert [(record.levelno, record.getMessage()) for record in caplog.records] == [
+        (logging.ERROR, "GET unmatched executed 4 SQL statements, budget is 3"),
+    ]
+
+
+@pytest.mark.anyio
+async def test_streamed_response_without_strict_mode_is_only_logged(engine, app_settings, caplog):
+    app_settings(sql_query_budget=3)
+    messages = []
+    await call(streaming_app(engine, 4), messages)
+    assert messages[0]["status"] == 200
+    assert [message["body"] for message in messages[1:]] == [b"0\n", b"1\n", b"2\n", b"3\n"]
+    assert [record.levelno for record in caplog.records] == [logging.WARNING]
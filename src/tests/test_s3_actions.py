@@ -0,0 +1,130 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import HTTPException, UploadFile
+from s3_actions import S3Client
+
+
+class FakeS3:
+    """Записує виклики boto3, які робить S3Client; failing — методи, що кидають помилку"""
+
+    def __init__(self, failing: tuple[str, ...] = ()):
+        self.calls: list[tuple[str, dict]] = []
+        self.failing = failing
+
+    def _call(self, name: str, kwargs: dict) -> None:
+        self.calls.append((name, kwargs))
+        if name in self.failing:
+            raise RuntimeError(f"{name} failed")
+
+    def put_object(self, **kwargs):
+        self._call("put_object", kwargs)
+        return {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    def create_multipart_upload(self, **kwargs):
+        self._call("create_multipart_upload", kwargs)
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, **kwargs):
+        self._call("upload_part", kwargs)
+        return {"ETag": f"etag-{kwargs['PartNumber']}"}
+
+    def complete_multipart_upload(self, **kwargs):
+        self._call("complete_multipart_upload", kwargs)
+
+    def abort_multipart_upload(self, **kwargs):
+        self._call("abort_multipart_upload", kwargs)
+
+    @property
+    def names(self) -> list[str]:
+        return [name for name, _ in self.calls]
+
+
+@pytest.fixture
+def s3():
+    """
+        S3Client з фейковим клієнтом і малими лімітами: частина — 4 байти, файл — до 10 байтів.
+        Атрибути підміняються в __dict__ класу, не звертаючись до lazy_class_attribute,
+        тож налаштування AWS не читаються.
+    """
+    fake = FakeS3()
+    executor = ThreadPoolExecutor(max_workers=1)
+    overrides = {
+        "client": fake,
+        "bucket_name": "bucket",
+        "chunk_size": 4,
+        "max_file_size": 10,
+        "executor": executor,
+    }
+    original = {name: vars(S3Client)[name] for name in overrides}
+    for name, value in overrides.items():
+        setattr(S3Client, name, value)
+    try:
+        yield S3Client(), fake
+    finally:
+        for name, value in original.items():
+            setattr(S3Client, name, value)
+        executor.shutdown()
+
+
+def upload(data: bytes, size: int | None = None) -> UploadFile:
+    # size=None — клієнт не передав розмір, ліміт перевіряється лише під час читання
+    return UploadFile(io.BytesIO(data), size=size, filename="file.bin")
+
+
+@pytest.mark.anyio
+async def test_small_file_is_a_single_put(s3):
+    client, fake = s3
+    await client.upload_file(upload(b"abc"), "key")
+    assert fake.names == ["put_object"]
+
+
+@pytest.mark.anyio
+async def test_multipart_upload_is_completed(s3):
+    client, fake = s3
+    await client.upload_file(upload(b"a" * 10), "key")
+    assert fake.names == ["create_multipart_upload", "upload_part", "upload_part", "upload_part",
+                          "complete_multipart_upload"]
+    parts = fake.calls[-1][1]["MultipartUpload"]["Parts"]
+    assert [part["PartNumber"] for part in parts] == [1, 2, 3]
+
+
+@pytest.mark.anyio
+async def test_oversized_stream_aborts_multipart_upload(s3):
+    client, fake = s3
+    with pytest.raises(HTTPException) as error:
+        await client.upload_file(upload(b"a" * 20), "key")
+    assert error.value.status_code == 400
+    assert error.value.detail.startswith("Supported file size")
+    # Третя частина вже перевищує ліміт: її не завантажують, а незавершене завантаження скасовують
+    assert fake.names == ["create_multipart_upload", "upload_part", "upload_part", "abort_multipart_upload"]
+    assert fake.calls[-1][1] == {"Bucket": "bucket", "Key": "key", "UploadId": "upload-1"}
+
+
+@pytest.mark.anyio
+async def test_declared_oversize_is_rejected_before_upload(s3):
+    client, fake = s3
+    with pytest.raises(HTTPException):
+        await client.upload_file(upload(b"a" * 20, size=20), "key")
+    assert fake.calls == []
+
+
+@pytest.mark.anyio
+async def test_failed_part_aborts_upload(s3):
+    client, fake = s3
+    fake.failing = ("upload_part",)
+    with pytest.raises(HTTPException) as error:
+        await client.upload_file(upload(b"a" * 8), "key")
+    assert error.value.detail == "Error during loading file file.bin"
+    assert fake.names[-1] == "abort_multipart_upload"
+    assert "complete_multipart_upload" not in fake.names
+
+
+@pytest.mark.anyio
+async def test_failed_abort_keeps_original_error(s3, caplog):
+    client, fake = s3
+    fake.failing = ("abort_multipart_upload",)
+    with pytest.raises(HTTPException) as error:
+        await client.upload_file(upload(b"a" * 20), "key")
+    assert error.value.detail.startswith("Supported file size")
+    assert "Failed to abort multipart upload upload-1 of key" in caplog.text